@@ -0,0 +1,1139 @@
+"""Data pipeline for the Team Bekfè tracker, without any Streamlit imports.
+
+Fetching, snapshots, parsing, aggregation and ranks. teambekfe.py wraps
+these in its shared caches; the benchmarks and the command line
+(python -m bekfe_core export.csv) call them directly.
+"""
+import argparse
+import contextlib
+import hashlib
+import http.client
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# -------------------------------------------------------------
+#             STAGE PROFILING
+# -------------------------------------------------------------
+# Opt-in per thread (one Streamlit rerun = one thread): start_profile()
+# collects a record for every `with stage(...)` block until stop_profile().
+# Memory is the net traced allocation and is only filled in while
+# tracemalloc is running.
+_profile = threading.local()
+
+def start_profile() -> list[dict]:
+    _profile.records = []
+    _profile.open = []
+    return _profile.records
+
+def stop_profile() -> list[dict]:
+    records = getattr(_profile, "records", None) or []
+    _profile.records = None
+    return records
+
+def profiling() -> bool:
+    return getattr(_profile, "records", None) is not None
+
+def profile_records() -> list[dict]:
+    # the records collected so far on this thread (live list, or [] if off)
+    return getattr(_profile, "records", None) or []
+
+@contextlib.contextmanager
+def stage(name: str):
+    records = getattr(_profile, "records", None)
+    if records is None:
+        yield {}
+        return
+    rec = {"stage": name, "depth": len(_profile.open)}
+    records.append(rec)
+    _profile.open.append(rec)
+    tracing = tracemalloc.is_tracing()
+    mem_start = tracemalloc.get_traced_memory()[0] if tracing else 0
+    start = time.perf_counter()
+    try:
+        yield rec
+    finally:
+        rec["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        if tracing:
+            rec["alloc_mb"] = round((tracemalloc.get_traced_memory()[0] - mem_start) / 2**20, 2)
+        _profile.open.pop()
+
+def annotate(**fields) -> None:
+    # add fields (e.g. cache="miss") to the innermost open stage
+    if getattr(_profile, "records", None) is not None and _profile.open:
+        _profile.open[-1].update(fields)
+
+# -------------------------------------------------------------
+#             ROBUST DATE PARSE (FORMAT DETECTION)
+# -------------------------------------------------------------
+# Same rules as the original two-pass parse: infer a month-first format,
+# and if more than 20% of rows fail, retry day-first and keep whichever
+# parsed more. The two candidate formats are guessed from the first value
+# (as pandas' own inference does) and tried on an evenly spaced sample, so
+# the full column is normally parsed once, with an explicit format. Only
+# when the sample lands close to the 20% line are both passes run.
+DATE_SAMPLE = 2000
+DATE_FALLBACK = 0.20
+DATE_MARGIN = 0.05
+
+_NOT_A_DATE = {"", "NaT", "nat", "NAT", "nan", "NaN", "NAN", "now", "today"}
+
+def detect_date_formats(series: pd.Series) -> tuple[str | None, str | None]:
+    # the first real value decides, exactly like pandas' format inference
+    for value in series:
+        if pd.isna(value) or (isinstance(value, str) and value in _NOT_A_DATE):
+            continue
+        if type(value) is not str:
+            break
+        # pandas warns when the guess contradicts dayfirst (e.g. "14/1/2025"
+        # with dayfirst=False); trying both orders is the point, so silence it
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            return guess_datetime_format(value, dayfirst=False), guess_datetime_format(value, dayfirst=True)
+    return None, None
+
+def _to_datetime(series: pd.Series, fmt: str | None, dayfirst: bool) -> pd.Series:
+    if fmt is None:
+        # no recognisable format: element-wise dateutil, like pandas' own fallback
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            return pd.to_datetime(series, errors="coerce", dayfirst=dayfirst)
+    return pd.to_datetime(series, errors="coerce", format=fmt)
+
+def robust_to_datetime(series: pd.Series, stats: dict | None = None,
+                       date_format: tuple | None = None) -> pd.Series:
+    """Parse a timestamp column; result.attrs["date_format"] is the (format,
+    dayfirst) used. Passing one back skips detection, so rows appended later
+    are read the way the rest of the sheet was."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if date_format is not None:
+        fmt, dayfirst = date_format
+        result = _to_datetime(series, fmt, dayfirst)
+        _date_stats(stats, series, result, fmt, dayfirst)
+        annotate(date_passes=1)
+        result.attrs["date_format"] = (fmt, dayfirst)
+        return result
+
+    fmt_m, fmt_d = detect_date_formats(series)
+    sample = series.iloc[::max(1, len(series) // DATE_SAMPLE)]
+    sample_m = _to_datetime(sample, fmt_m, False)
+    miss_m = sample_m.isna().mean() if len(sample) else 0.0
+
+    result, dayfirst, passes = None, False, 1
+    if miss_m < DATE_FALLBACK - DATE_MARGIN:
+        result = _to_datetime(series, fmt_m, False)
+        if result.isna().mean() > DATE_FALLBACK:
+            result = None  # the sample was misleading: settle it exactly below
+    elif miss_m > DATE_FALLBACK + DATE_MARGIN:
+        sample_d = _to_datetime(sample, fmt_d, True)
+        margin = DATE_MARGIN * len(sample)
+        if sample_d.notna().sum() > sample_m.notna().sum() + margin:
+            result, dayfirst = _to_datetime(series, fmt_d, True), True
+        elif sample_d.notna().sum() < sample_m.notna().sum() - margin:
+            result = _to_datetime(series, fmt_m, False)
+
+    if result is None:
+        # original two-pass rule, run on the whole column
+        result = _to_datetime(series, fmt_m, False)
+        if result.isna().mean() > DATE_FALLBACK:
+            passes = 2
+            s2 = _to_datetime(series, fmt_d, True)
+            if s2.notna().sum() > result.notna().sum():
+                result, dayfirst = s2, True
+
+    fmt = fmt_d if dayfirst else fmt_m
+    _date_stats(stats, series, result, fmt, dayfirst)
+    annotate(date_passes=passes)
+    result.attrs["date_format"] = (fmt, dayfirst)
+    return result
+
+def _date_stats(stats: dict | None, series: pd.Series, result: pd.Series, fmt: str | None, dayfirst: bool) -> None:
+    if stats is None:
+        return
+    label = f"{'day-first retry' if dayfirst else 'inferred'} {fmt or '(dateutil)'}"
+    counts = stats.setdefault("date_strategies", {})
+    counts[label] = counts.get(label, 0) + int(result.notna().sum())
+    failed = int((result.isna() & series.notna()).sum())
+    counts["unparsed"] = counts.get("unparsed", 0) + failed
+
+# -------------------------------------------------------------
+#             CLEAN NAME + DURATION
+# -------------------------------------------------------------
+# Team Bekfè's spellings; other teams bring their own alias map (keys are
+# matched after name_key normalisation, so "Dani Mix!" hits "dani mix").
+DEFAULT_ALIASES = {
+    "vincent":"Vincent","alain":"Alain","danimix":"Danimix",
+    "dani mix":"Danimix","dimitri":"Dimitri","douglas":"Douglas",
+    "louis":"Louis","bousik":"Bousik","gregory":"Gregory",
+    "mikael":"Mikael","junior":"Junior"
+}
+
+def name_key(n: str) -> str:
+    return re.sub(r"[^a-z0-9 ]", "", n.lower().strip())
+
+def clean_name(n, aliases: dict | None = None):
+    if not isinstance(n, str):
+        return ""
+    n = name_key(n)
+    return (DEFAULT_ALIASES if aliases is None else aliases).get(n, n.title())
+
+def alias_key(aliases: dict | None) -> str:
+    # short fingerprint of an alias map, for versioning data parsed with it
+    if aliases is None:
+        return "default"
+    return hashlib.sha256(json.dumps(aliases, sort_keys=True).encode()).hexdigest()[:16]
+
+def parse_duration(t):
+    if not isinstance(t, str):
+        return 0
+    t = t.lower()
+    h = re.search(r"(\d+)\s*(hour|hr|h)", t)
+    m = re.search(r"(\d+)\s*(min|m)", t)
+    hours = int(h.group(1)) if h else 0
+    mins  = int(m.group(1)) if m else 0
+
+    if not h and not m:
+        nums = re.findall(r"\d+", t)
+        if len(nums) == 1:
+            mins = int(nums[0])
+        elif len(nums) == 2:
+            hours = int(nums[0])
+            mins = int(nums[1])
+    return hours * 60 + mins
+
+# Vectorized version of parse_duration: same minutes for every input, but
+# computed with column-wide regex extraction instead of per-row Python calls.
+# Form answers repeat a lot ("1h", "45 min", ...), so only the distinct
+# strings are parsed and the result is mapped back with take().
+# Also returns how many non-empty values matched none of the rules.
+_HOURS_RE = r"(\d+)\s*(?:hour|hr|h)"
+_MINS_RE = r"(\d+)\s*(?:min|m)"
+
+def _parse_duration_values(t: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    hours = t.str.extract(_HOURS_RE, expand=False).astype(float)
+    mins = t.str.extract(_MINS_RE, expand=False).astype(float)
+    has_unit = hours.notna() | mins.notna()
+    hours = hours.fillna(0)
+    mins = mins.fillna(0)
+
+    # no "h"/"min" marker: a bare number is minutes, two numbers are "h m"
+    nums = t.str.count(r"\d+")
+    one = ~has_unit & (nums == 1)
+    two = ~has_unit & (nums == 2)
+    if one.any():
+        mins[one] = t[one].str.extract(r"(\d+)", expand=False).astype(float)
+    if two.any():
+        pair = t[two].str.extract(r"(\d+)\D+(\d+)").astype(float)
+        hours[two] = pair[0]
+        mins[two] = pair[1]
+
+    parsed = (has_unit | one | two).to_numpy()
+    return (hours * 60 + mins).to_numpy(dtype="int64"), parsed
+
+def parse_durations(series: pd.Series) -> tuple[pd.Series, int]:
+    try:
+        lowered = series.str.lower()
+    except AttributeError:
+        # numeric column: parse_duration returns 0 for non-strings
+        return pd.Series(0, index=series.index, dtype="int64"), int(series.notna().sum())
+
+    # non-strings become NaN in `lowered` and get code -1 (0 minutes)
+    codes, uniques = pd.factorize(lowered)
+    minutes, parsed = _parse_duration_values(pd.Series(uniques, dtype=object))
+    minutes = np.append(minutes, 0)
+    parsed = np.append(parsed, False)
+
+    unparsed = int((series.notna().to_numpy() & ~parsed[codes]).sum())
+    return pd.Series(minutes[codes], index=series.index), unparsed
+
+# -------------------------------------------------------------
+#             ROW PARSING (RAW SHEET -> TYPED FRAME)
+# -------------------------------------------------------------
+def parse_rows(_df: pd.DataFrame, aliases: dict | None = None,
+               date_format: tuple | None = None) -> tuple[pd.DataFrame, dict]:
+    """Type and clean a raw sheet in place; also return parse statistics.
+
+    The date format used ends up in _df.attrs["date_format"].
+    """
+    _df.columns = [c.strip() for c in _df.columns]
+    stats = {}
+
+    c_ts, c_name, c_dur = _df.columns[0], _df.columns[1], _df.columns[4]
+    with stage("robust_to_datetime"):
+        parsed = robust_to_datetime(_df[c_ts], stats, date_format)
+        _df.attrs["date_format"] = parsed.attrs.get("date_format")
+        _df[c_ts] = parsed
+        _df["year"] = _df[c_ts].dt.year
+    with stage("clean_name"):
+        if aliases is not None:
+            aliases = {name_key(k): v for k, v in aliases.items()}
+        _df[c_name] = _df[c_name].apply(clean_name, aliases=aliases)
+    with stage("parse_duration"):
+        minutes, stats["unparsed_durations"] = parse_durations(_df[c_dur])
+        _df["minutes"] = minutes
+    return _df, stats
+
+def merge_stats(old: dict, new: dict) -> dict:
+    # parse statistics are counts, so batches parsed separately add up
+    merged = dict(old)
+    for key, value in new.items():
+        if isinstance(value, dict):
+            merged[key] = merge_stats(merged.get(key, {}), value)
+        else:
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+# -------------------------------------------------------------
+#             MUSCLE EXTRACTION (LONG FORMAT, ALL SEASONS)
+# -------------------------------------------------------------
+# One row per (entry, muscle): "Chest (pecs), Back" -> "Chest", "Back".
+# It keeps the row frame's timestamp order, so each season is again one
+# contiguous block (season_bounds) and a member's entries are positions in
+# it (muscle_rows): season and member views are iloc slices, not masks.
+@stage("muscle extraction")
+def muscle_table(_df: pd.DataFrame) -> pd.DataFrame:
+    c_name, c_mus = _df.columns[1], _df.columns[3]
+    try:
+        items = _df[c_mus].str.split(",").explode()
+    except AttributeError:
+        items = pd.Series(dtype=object)
+    items = items[items.notna()]
+    items = items[items.str.strip() != ""]
+    muscles = items.str.split("(", n=1).str[0].str.strip()
+
+    return pd.DataFrame({
+        "row": muscles.index,
+        "user": _df.loc[muscles.index, c_name].array,
+        "year": _df.loc[muscles.index, "year"].array,
+        "muscle": pd.Categorical(muscles.to_numpy(dtype=object)),
+    })
+
+def muscle_rows(muscles: pd.DataFrame, bounds: dict) -> dict[int, dict[str, np.ndarray]]:
+    # per season, each member's positions within the season's block of the
+    # muscle table, oldest first (count_muscles breaks ties by first seen)
+    users = muscles["user"]
+    out = {}
+    for year, (start, stop) in bounds.items():
+        part = users.iloc[start:stop]
+        out[year] = part.groupby(part, observed=True, sort=False).indices
+    return out
+
+def count_muscles(table: pd.DataFrame) -> pd.Series:
+    # sort=False keeps first-seen order, so ties rank like the old dict counts
+    return table.groupby("muscle", sort=False, observed=True).size()
+
+# -------------------------------------------------------------
+#             RANKS
+# -------------------------------------------------------------
+# The one copy of the rank thresholds: minimum sessions in a season, lowest
+# rank first. RANK_MAX (a session every day) is the ceiling past S.
+RANKS = pd.DataFrame({
+    "letter": ["E", "D", "C", "B", "A", "S"],
+    "min_sessions": [0, 30, 60, 120, 180, 250],
+})
+RANK_MAX = 365
+
+def rank_levels(sessions) -> np.ndarray:
+    # index into RANKS of the highest threshold each count has reached
+    return np.searchsorted(RANKS["min_sessions"].to_numpy(), np.asarray(sessions), side="right") - 1
+
+def rank_letters(sessions: pd.Series) -> pd.Series:
+    return pd.Series(RANKS["letter"].to_numpy()[rank_levels(sessions)], index=sessions.index)
+
+def rank_progress(sessions: pd.Series) -> pd.DataFrame:
+    """Rank, next rank, its threshold and progress (0-1) towards it, for every member."""
+    mins, letters = RANKS["min_sessions"].to_numpy(), RANKS["letter"].to_numpy()
+    level = rank_levels(sessions)
+    top = level == len(mins) - 1
+    nxt = np.minimum(level + 1, len(mins) - 1)
+    next_at = np.where(top, RANK_MAX, mins[nxt])
+    progress = (sessions.to_numpy() - mins[level]) / (next_at - mins[level])
+    return pd.DataFrame({
+        "rank": letters[level],
+        "next_rank": np.where(top, None, letters[nxt]),
+        "next_at": next_at,
+        "progress": np.clip(progress, 0, 1),
+    }, index=sessions.index)
+
+def rank_promotions(rows: pd.DataFrame, year: pd.Series) -> pd.DataFrame:
+    """Date each member reached each rank above E, per season (NaN if not yet).
+
+    Rows are in timestamp order, so a member's n-th session of the season is
+    the one that takes them to n sessions: a cumulative count per member
+    finds every crossing at once.
+    """
+    c_ts, c_name = rows.columns[0], rows.columns[1]
+    count = rows.groupby([year, rows[c_name]], observed=True).cumcount() + 1
+    hit = count.isin(RANKS["min_sessions"].iloc[1:]).to_numpy()
+    crossed = pd.DataFrame({
+        "year": year.to_numpy()[hit],
+        "member": rows[c_name].to_numpy()[hit],
+        "letter": RANKS["letter"].to_numpy()[rank_levels(count.to_numpy()[hit])],
+        "date": rows[c_ts].dt.date.to_numpy()[hit],
+    })
+    return (
+        crossed.set_index(["year", "member", "letter"])["date"].unstack("letter")
+        .reindex(columns=RANKS["letter"].iloc[1:])
+    )
+
+# -------------------------------------------------------------
+#             DAILY ACTIVITY BITMAP
+# -------------------------------------------------------------
+# Per season, a members x days boolean matrix: bits[m, d] is set when
+# member m logged anything on day d (0 = Jan 1). Streaks, calendar rolling
+# rates and consistency are whole-matrix NumPy passes over it, so their
+# cost grows with days, not with a Python loop per member. Statistics are
+# taken as of the last day anyone logged (Dec 31 for finished seasons),
+# which keeps them a function of the data version alone.
+ROLLING_WINDOWS = (7, 30)
+
+def empty_activity() -> dict:
+    # "rows" counts the dated rows already marked (see extend_activity)
+    return {"rows": 0, "seasons": {}}
+
+def mark_activity(activity: dict, rows: pd.DataFrame) -> dict:
+    """A copy of activity with the days of rows (dated, in any order) set."""
+    c_ts, c_name = rows.columns[0], rows.columns[1]
+    named = rows[rows[c_name].notna()]
+    years = named["year"].astype(int).to_numpy()
+    seasons = dict(activity["seasons"])
+    for year in np.unique(years):
+        part = named[years == year]
+        day = (part[c_ts].dt.normalize() - pd.Timestamp(int(year), 1, 1)).dt.days.to_numpy()
+        names = part[c_name].to_numpy(dtype=object)
+        old = seasons.get(int(year))
+        members = old["members"] if old else np.array([], dtype=object)
+        known = pd.Index(members).get_indexer(names)
+        # newcomers get fresh rows below the existing members
+        members = np.concatenate([members, pd.unique(names[known == -1])])
+        bits = np.zeros((len(members), pd.Timestamp(int(year), 12, 31).dayofyear), dtype=bool)
+        if old:
+            bits[:len(old["members"])] = old["bits"]
+        bits[pd.Index(members).get_indexer(names), day] = True
+        seasons[int(year)] = {"members": members, "bits": bits}
+    return {"rows": activity["rows"] + len(rows), "seasons": seasons}
+
+def activity_matrix(_df: pd.DataFrame) -> dict:
+    # rows are in timestamp order with undated rows last (see sort_rows)
+    known = int(_df["year"].notna().sum())
+    return mark_activity(empty_activity(), _df.iloc[:known])
+
+def extend_activity(activity: dict, old: pd.DataFrame, _df: pd.DataFrame) -> dict | None:
+    """Mark only the rows appended since old, or None if _df does not extend it.
+
+    The form is append-only and rows are in timestamp order, so after a
+    refresh the previously marked rows are normally the first ones of the
+    new frame; anything else (an edited or re-sorted sheet) needs a rebuild.
+    """
+    n = activity["rows"]
+    known = int(_df["year"].notna().sum())
+    if known < n:
+        return None
+    for col in _df.columns[:2]:
+        if not same_values(old[col].iloc[:n], _df[col].iloc[:n]):
+            return None
+    return mark_activity(activity, _df.iloc[n:known])
+
+def same_values(a: pd.Series, b: pd.Series) -> bool:
+    # positional equality (missing == missing) without boxing every value
+    # into a Python object: timestamps compare as datetime64, categoricals
+    # by code once a's categories are mapped onto b's
+    if isinstance(a.dtype, pd.CategoricalDtype) and isinstance(b.dtype, pd.CategoricalDtype):
+        recode = b.cat.categories.get_indexer(a.cat.categories)
+        recode[recode == -1] = -2  # a category b does not have never matches
+        recode = np.append(recode, -1)  # code -1 (missing) stays missing
+        return bool(np.array_equal(recode[a.cat.codes.to_numpy()], b.cat.codes.to_numpy()))
+    if a.dtype != b.dtype:
+        return False
+    return pd.Series(a.to_numpy()).equals(pd.Series(b.to_numpy()))
+
+def run_ending(bits: np.ndarray, end: int) -> np.ndarray:
+    # per row, the length of the run of set bits ending at column end
+    if end < 0:
+        return np.zeros(len(bits), dtype=int)
+    gap = ~bits[:, end::-1]
+    return np.where(gap.any(axis=1), gap.argmax(axis=1), end + 1)
+
+def activity_stats(activity: dict) -> pd.DataFrame:
+    """Streaks, rolling rates and consistency per (year, member)."""
+    seasons = activity["seasons"]
+    frames = []
+    for year, season in seasons.items():
+        bits = season["bits"]
+        active = bits.any(axis=0)
+        asof = bits.shape[1] - 1
+        if year == max(seasons) and active.any():
+            asof = int(np.flatnonzero(active)[-1])
+        # a streak still counts as current until a full day has been missed
+        current = np.where(bits[:, asof], run_ending(bits, asof), run_ending(bits, asof - 1))
+        edges = np.diff(np.pad(bits, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+        rows, starts = np.nonzero(edges == 1)
+        longest = np.zeros(len(bits), dtype=int)
+        np.maximum.at(longest, rows, np.nonzero(edges == -1)[1] - starts)
+        stats = {
+            "active_days": bits[:, :asof + 1].sum(axis=1),
+            "streak": current,
+            "best_streak": longest,
+        }
+        for window in ROLLING_WINDOWS:
+            recent = bits[:, max(0, asof - window + 1):asof + 1]
+            stats[f"rate_{window}d"] = (recent.mean(axis=1) * 100).round(1)
+        stats["consistency"] = (stats["active_days"] / (asof + 1) * 100).round(1)
+        frames.append(pd.DataFrame(stats, index=pd.MultiIndex.from_product(
+            [[year], season["members"]], names=["year", "member"])))
+    if not frames:
+        # no dated rows: same shape, so season_cube can still join it
+        return pd.DataFrame(
+            columns=["active_days", "streak", "best_streak",
+                     *(f"rate_{w}d" for w in ROLLING_WINDOWS), "consistency"],
+            index=pd.MultiIndex.from_arrays([[], []], names=["year", "member"]),
+        )
+    return pd.concat(frames)
+
+def calendar_rolling(year: np.ndarray, day: np.ndarray, values: np.ndarray, window: int) -> np.ndarray:
+    # mean of values over the window calendar days ending at each (year, day),
+    # days without entries counting as 0; windows are cut at Jan 1
+    base = (year - year.min()) * 367 if len(year) else year
+    totals = np.cumsum(np.bincount(base + day, weights=values))
+    totals = np.concatenate([[0.0], totals])
+    lo = np.maximum(day + 1 - window, 0)
+    return (totals[base + day + 1] - totals[base + lo]) / np.minimum(window, day + 1)
+
+# -------------------------------------------------------------
+#             SEASON x MEMBER AGGREGATES
+# -------------------------------------------------------------
+# Everything the Profile, Leaderboards and Fitness Activity tabs need,
+# computed for all seasons at once and indexed by (year, member) and
+# (year, date). Switching seasons is then a .loc lookup.
+@stage("season groupbys")
+def season_cube(_df: pd.DataFrame, activity: dict | None = None) -> dict[str, pd.DataFrame]:
+    c_ts, c_name = _df.columns[0], _df.columns[1]
+    rows = _df[_df["year"].notna()]
+    year = rows["year"].astype(int)
+    if activity is None:
+        activity = activity_matrix(_df)
+
+    g = rows.groupby([year, rows[c_name]], observed=True)
+    members = pd.DataFrame({"sessions": g.size(), "minutes": g["minutes"].sum()})
+    members.index.names = ["year", "member"]
+    members["hours"] = (members["minutes"] / 60).round(1)
+    members = members.join(activity_stats(activity))
+    members = members.join(rank_progress(members["sessions"]))
+    promotions = rank_promotions(rows, year).reindex(members.index)
+    # the date the current rank was reached; E is where everyone starts
+    reached = promotions.to_numpy()[np.arange(len(members)), np.maximum(rank_levels(members["sessions"]) - 1, 0)]
+    members["promoted_on"] = np.where(members["rank"] == "E", None, reached)
+
+    daily = rows.groupby([year, rows[c_ts].dt.date]).size().to_frame("sessions")
+    daily.index.names = ["year", "date"]
+    # sessions per calendar day over the last week, empty days included
+    dates = pd.to_datetime(daily.index.get_level_values("date"))
+    daily["7day_avg"] = calendar_rolling(
+        daily.index.get_level_values("year").to_numpy(), dates.dayofyear.to_numpy() - 1,
+        daily["sessions"].to_numpy(), 7,
+    )
+    bounds = season_bounds(_df)
+    return {
+        "members": members, "promotions": promotions, "daily": daily, "activity": activity,
+        "bounds": bounds, "member_rows": member_rows(_df, bounds),
+    }
+
+def weekly_buckets(daily: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    # past max_points, one point per calendar week (mean of the 7-day
+    # average), dated at the Monday; shorter series are returned as-is
+    if len(daily) <= max_points:
+        return daily
+    week = pd.to_datetime(daily["date"]).dt.to_period("W").dt.start_time.dt.date
+    return (
+        daily.groupby(week.rename("date").to_numpy())
+        .agg({"sessions": "sum", "7day_avg": "mean"})
+        .rename_axis("date").reset_index()
+    )
+
+def season_slice(table: pd.DataFrame, year: int) -> pd.DataFrame:
+    if year in table.index.levels[0]:
+        return table.loc[year]
+    return table.iloc[:0].droplevel(0)
+
+def sort_rows(_df: pd.DataFrame) -> pd.DataFrame:
+    # timestamp order (already the case for form exports), undated rows last
+    return _df.sort_values(_df.columns[0], kind="stable", na_position="last")
+
+def season_bounds(_df: pd.DataFrame) -> dict[int, tuple[int, int]]:
+    # rows are in timestamp order (see sort_rows), so each season is one
+    # contiguous run of positions; rows without a year sort to the end
+    known = int(_df["year"].notna().sum())
+    years = _df["year"].iloc[:known].to_numpy(dtype="int64")
+    values, starts = np.unique(years, return_index=True)
+    stops = np.append(starts[1:], known)
+    return {int(y): (int(a), int(b)) for y, a, b in zip(values, starts, stops)}
+
+def season_rows(_df: pd.DataFrame, bounds: dict, year: int) -> pd.DataFrame:
+    # a positional slice: no copy of the season's rows
+    start, stop = bounds.get(year, (0, 0))
+    return _df.iloc[start:stop]
+
+def member_rows(_df: pd.DataFrame, bounds: dict) -> dict[int, dict[str, np.ndarray]]:
+    # per season, each member's row positions within the season slice,
+    # newest first; rows are already in timestamp order, so this is a
+    # grouping rather than a sort and paged views just slice the arrays
+    names = _df[_df.columns[1]]
+    out = {}
+    for year, (start, stop) in bounds.items():
+        part = names.iloc[start:stop]
+        groups = part.groupby(part, observed=True, sort=False).indices
+        out[year] = {member: rows[::-1] for member, rows in groups.items()}
+    return out
+
+# -------------------------------------------------------------
+#             COMPACT IN-MEMORY LAYOUT
+# -------------------------------------------------------------
+# Every session and cache entry holds these frames, so keep them small:
+# repeated text (names, muscle lists, duration answers, ...) becomes
+# categorical and minutes/year the smallest integer type that fits.
+def compact_frame(_df: pd.DataFrame) -> pd.DataFrame:
+    for col in _df.columns:
+        if _df[col].dtype == object and _df[col].nunique() <= len(_df) // 2:
+            _df[col] = _df[col].astype("category")
+    _df["minutes"] = pd.to_numeric(_df["minutes"], downcast="integer")
+    _df["year"] = _df["year"].astype("Int16")
+    return _df
+
+# -------------------------------------------------------------
+#             DATA SOURCE (HTTP ENDPOINT OR LOCAL FILE)
+# -------------------------------------------------------------
+# A source is any http(s) URL (the Sheets export, a stand-in server) or a
+# local .csv/.parquet path. The state dict keeps the last good payload and
+# the validators needed to ask the source "has anything changed since?".
+def source_format(source: str) -> str:
+    path = urllib.parse.urlsplit(source).path if is_remote(source) else source
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+def is_remote(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+def new_source_state() -> dict:
+    return {
+        "raw": None, "hash": None,
+        "etag": None, "last_modified": None, "stamp": None, "error": None,
+    }
+
+def fetch_http(source: str, state: dict, timeout: float) -> bytes | None:
+    req = urllib.request.Request(source)
+    if state["raw"] is not None:
+        if state["etag"]:
+            req.add_header("If-None-Match", state["etag"])
+        if state["last_modified"]:
+            req.add_header("If-Modified-Since", state["last_modified"])
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            raw = resp.read()
+            state["etag"] = resp.headers.get("ETag")
+            state["last_modified"] = resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+    return raw
+
+def fetch_file(path: str, state: dict) -> bytes | None:
+    info = os.stat(path)
+    stamp = (info.st_size, info.st_mtime_ns)
+    if state["raw"] is not None and stamp == state["stamp"]:
+        return None
+    raw = Path(path).read_bytes()
+    state["stamp"] = stamp
+    return raw
+
+def fetch_source(source: str, state: dict, timeout: float = 20.0) -> tuple[bytes | None, str | None]:
+    """Return (raw bytes, sha256) of the source, asking it for changes first.
+
+    Unchanged sources (304, same size/mtime) keep the previous bytes and hash,
+    so nothing downstream is re-parsed. If the fetch fails, the last good
+    payload is kept and the error is recorded; (None, None) means there has
+    never been a successful fetch with this state.
+    """
+    try:
+        if is_remote(source):
+            raw = fetch_http(source, state, timeout)
+        else:
+            raw = fetch_file(source, state)
+        state["error"] = None
+    except (OSError, ValueError, http.client.HTTPException) as e:
+        # HTTPException: e.g. IncompleteRead when the connection drops mid-body
+        raw = None
+        state["error"] = f"{type(e).__name__}: {e}"
+    if raw is not None:
+        state["raw"] = raw
+        state["hash"] = hashlib.sha256(raw).hexdigest()
+    return state["raw"], state["hash"]
+
+# -------------------------------------------------------------
+#             LOCAL SNAPSHOT (APPEND-ONLY INCREMENTAL INGEST)
+# -------------------------------------------------------------
+# Form responses are only ever appended, so the parsed rows are kept on disk
+# with a high-water mark: the byte length of the CSV they came from and its
+# SHA-256. If the new download still starts with exactly those bytes, only
+# the tail is parsed and appended. Any edit to earlier rows breaks the
+# checksum and triggers a full rebuild.
+def snapshot_paths(store: Path) -> tuple[Path, Path]:
+    return store / "rows.parquet", store / "rows.json"
+
+def snapshot_hash(store: Path) -> str | None:
+    # only a snapshot read_snapshot accepts counts: the rows file can be
+    # missing or stale if a process died between the two renames
+    snapshot = read_snapshot(store)
+    return snapshot[1].get("sha256") if snapshot is not None else None
+
+def read_snapshot(store: Path, raw: bytes | None = None, aliases: dict | None = None):
+    # raw=None skips the prefix check: used when the source is unreachable
+    rows_path, meta_path = snapshot_paths(store)
+    try:
+        meta = json.loads(meta_path.read_text())
+        offset = meta["offset"]
+        if raw is not None:
+            if meta.get("aliases", "default") != alias_key(aliases):
+                return None  # names were cleaned with a different alias map
+            if "date_format" not in meta:
+                return None  # written before the date format was recorded
+            if len(raw) < offset or hashlib.sha256(raw[:offset]).hexdigest() != meta["sha256"]:
+                return None
+            # the old export must have ended on a row boundary
+            if offset and raw[offset - 1:offset] != b"\n" and raw[offset:offset + 1] not in (b"", b"\r", b"\n"):
+                return None
+        rows = pd.read_parquet(rows_path)
+    except (OSError, ValueError, KeyError):
+        return None
+    if len(rows) != meta["rows"] or "stats" not in meta:
+        return None
+    return rows, meta
+
+def write_snapshot(store: Path, _df: pd.DataFrame, raw: bytes, data_hash: str, stats: dict,
+                   aliases: dict | None = None, date_format: tuple | None = None) -> None:
+    rows_path, meta_path = snapshot_paths(store)
+    meta = {
+        "offset": len(raw),
+        "sha256": data_hash,
+        "rows": len(_df),
+        "stats": stats,
+        "aliases": alias_key(aliases),
+        # appended rows are parsed alone: they must reuse the sheet's format
+        "date_format": date_format,
+    }
+    try:
+        store.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so concurrent readers never see half a file
+        tmp_rows = rows_path.with_suffix(".parquet.tmp")
+        tmp_meta = meta_path.with_suffix(".json.tmp")
+        _df.to_parquet(tmp_rows, index=False)
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_rows, rows_path)
+        os.replace(tmp_meta, meta_path)
+    except (OSError, ValueError, ImportError):
+        # the snapshot is only an accelerator; next refresh does a full parse
+        pass
+
+def parse_new_rows(old: pd.DataFrame, raw: bytes, offset: int, aliases: dict | None = None,
+                   date_format: tuple | None = None) -> tuple[pd.DataFrame, dict]:
+    header = raw[:raw.index(b"\n") + 1]
+    new = pd.read_csv(io.BytesIO(header + raw[offset:]), dtype=str)
+    # match the column types the full parse inferred for the old rows
+    for c_raw, c_old in zip(new.columns, old.columns):
+        if pd.api.types.is_numeric_dtype(old[c_old]):
+            try:
+                new[c_raw] = pd.to_numeric(new[c_raw])
+            except ValueError:
+                pass
+    return parse_rows(new, aliases, date_format)
+
+# -------------------------------------------------------------
+#             PREPARED DATASET
+# -------------------------------------------------------------
+def prepare_data(data_hash: str, raw: bytes | None, fmt: str = "csv", store: Path | None = None,
+                 compact: bool = True, aliases: dict | None = None) -> pd.DataFrame:
+    """Parse raw source bytes into the timestamp-ordered row frame.
+
+    With a store directory, CSV input goes through the incremental snapshot,
+    and raw=None serves the stored snapshot as-is (source unreachable).
+    """
+    changed, date_format = False, None
+    if raw is None:
+        snapshot = read_snapshot(store) if store is not None else None
+        if snapshot is None:
+            raise FileNotFoundError(f"no usable row snapshot in {store}")
+        _df, meta = snapshot
+        stats = meta["stats"]
+    elif fmt == "parquet":
+        _df, stats = parse_rows(pd.read_parquet(io.BytesIO(raw)), aliases)
+    else:
+        snapshot = read_snapshot(store, raw, aliases) if store is not None else None
+        if snapshot is None:
+            _df, stats = parse_rows(pd.read_csv(io.BytesIO(raw)), aliases)
+            date_format = _df.attrs["date_format"]
+            changed = store is not None
+        else:
+            _df, meta = snapshot
+            offset, stats = meta["offset"], meta["stats"]
+            if meta["date_format"] is not None:
+                date_format = tuple(meta["date_format"])
+            if raw[offset:].strip():
+                new, new_stats = parse_new_rows(_df, raw, offset, aliases, date_format)
+                _df = pd.concat([_df, new], ignore_index=True)
+                stats = merge_stats(stats, new_stats)
+            changed = offset != len(raw)
+
+    _df = sort_rows(_df)
+    if compact:
+        with stage("compact"):
+            _df = compact_frame(_df)
+    if changed:
+        write_snapshot(store, _df, raw, data_hash, stats, aliases, date_format)
+
+    _df.attrs["parse_stats"] = stats
+    _df.attrs["memory_mb"] = round(_df.memory_usage(deep=True).sum() / 2**20, 2)
+    _df.attrs["data_hash"] = data_hash
+    return _df
+
+def build_dataset(data_hash: str, raw: bytes | None, fmt: str = "csv", store: Path | None = None,
+                  compact: bool = True, aliases: dict | None = None, previous: dict | None = None) -> dict:
+    """Everything the tabs read, built once per data version.
+
+    The version is the source's SHA-256, mixed with the alias map when a
+    team brings its own, since the same sheet cleaned differently is
+    different data (and must not share cached figures or results).
+    With the previous version's dataset, the activity bitmap only marks
+    the rows appended since.
+    """
+    version = data_hash
+    if aliases is not None:
+        version = hashlib.sha256(f"{data_hash}:{alias_key(aliases)}".encode()).hexdigest()
+    with stage("prepare_data"):
+        df = prepare_data(data_hash, raw, fmt, store, compact, aliases)
+        df.attrs["data_hash"] = version
+    with stage("muscle table"):
+        muscles = muscle_table(df)
+        muscle_bounds = season_bounds(muscles)
+    with stage("activity bitmap") as rec:
+        activity = None
+        if previous is not None:
+            activity = extend_activity(previous["cube"]["activity"], previous["df"], df)
+        rec["mode"] = "incremental" if activity is not None else "full"
+        if activity is None:
+            activity = activity_matrix(df)
+    with stage("season cube"):
+        cube = season_cube(df, activity)
+    data = {
+        "hash": version, "source_hash": data_hash, "df": df, "cube": cube, "muscles": muscles,
+        "muscle_bounds": muscle_bounds, "muscle_rows": muscle_rows(muscles, muscle_bounds),
+    }
+    with stage("season results") as rec:
+        stored = read_results(store, version) if store is not None else None
+        rec["cache"] = "hit" if stored is not None else "miss"
+        data["seasons"] = stored or {year: season_results(data, year) for year in cube["bounds"]}
+    return data
+
+def load_file(path: str, compact: bool = True, aliases: dict | None = None) -> dict:
+    raw = Path(path).read_bytes()
+    return build_dataset(hashlib.sha256(raw).hexdigest(), raw, source_format(path),
+                         compact=compact, aliases=aliases)
+
+def dataset_bytes(data: dict) -> int:
+    # in-memory size of a built dataset, for memory-bounded caching
+    frames = [data["df"], data["muscles"], *(t for t in data["cube"].values() if isinstance(t, pd.DataFrame))]
+    frames += [t for results in data["seasons"].values() for t in results.values() if isinstance(t, pd.DataFrame)]
+    index = sum(rows.nbytes for season in data["cube"]["member_rows"].values() for rows in season.values())
+    index += sum(rows.nbytes for season in data["muscle_rows"].values() for rows in season.values())
+    index += sum(season["bits"].nbytes for season in data["cube"]["activity"]["seasons"].values())
+    return int(sum(f.memory_usage(deep=True).sum() for f in frames)) + index
+
+# -------------------------------------------------------------
+#             SHARED DATASET CACHE (LRU, MEMORY-BOUNDED)
+# -------------------------------------------------------------
+# One process serves several teams, so their built datasets share a single
+# cache capped by total in-memory size: the least recently viewed team is
+# dropped first and rebuilt (from its snapshot) when someone opens it
+# again. Each entry carries its team's TTL; expired entries keep being
+# served until a refresh replaces or renews them.
+class DatasetCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry["data"]
+
+    def peek(self, key: str) -> dict | None:
+        # for refreshers: no recency bump, not counted
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry["data"] if entry is not None else None
+
+    def put(self, key: str, data: dict, ttl: float) -> None:
+        entry = {"data": data, "bytes": dataset_bytes(data), "ttl": ttl, "stored": time.monotonic()}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            # always keep the entry just stored, even if it alone is over budget
+            while len(self._entries) > 1 and self.total_bytes() > self.max_bytes:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def renew(self, key: str) -> None:
+        # the source was checked and is unchanged: restart the TTL
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["stored"] = time.monotonic()
+
+    def expired(self) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [k for k, e in self._entries.items() if now - e["stored"] >= e["ttl"]]
+
+    def total_bytes(self) -> int:
+        return sum(e["bytes"] for e in self._entries.values())
+
+    def info(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                **self.stats,
+                "mb": round(self.total_bytes() / 2**20, 1),
+                "max_mb": round(self.max_bytes / 2**20, 1),
+                "entries": {
+                    k: {"mb": round(e["bytes"] / 2**20, 1), "age_s": round(now - e["stored"]), "ttl_s": e["ttl"]}
+                    for k, e in self._entries.items()
+                },
+            }
+
+# -------------------------------------------------------------
+#             SEASON SUMMARIES
+# -------------------------------------------------------------
+def leaderboard(members: pd.DataFrame) -> pd.DataFrame:
+    # one season's slice of the members table, most sessions first
+    lb = pd.DataFrame({
+        "User": members.index,
+        "Sessions": members["sessions"].values,
+        "Hours": members["hours"].values,
+        "Consistency %": members["consistency"].values,
+        "Rank": members["rank"].values,
+        "Rank Since": members["promoted_on"].values,
+        "To Next Rank": members["progress"].values,
+    }).sort_values("Sessions", ascending=False).reset_index(drop=True)
+    lb.insert(0, "Position", lb.index + 1)
+    return lb
+
+def season_summary(dataset: dict, year: int, top: int = 5) -> dict:
+    members = season_slice(dataset["cube"]["members"], year)
+    muscles = season_rows(dataset["muscles"], dataset["muscle_bounds"], year)
+    counts = count_muscles(muscles).sort_values(ascending=False)
+    leader = members["sessions"].idxmax() if len(members) else None
+    return {
+        "season": year,
+        "members": len(members),
+        "sessions": int(members["sessions"].sum()),
+        "hours": round(float(members["minutes"].sum()) / 60, 1),
+        "active_days": len(season_slice(dataset["cube"]["daily"], year)),
+        "top_member": leader,
+        "top_member_rank": members.at[leader, "rank"] if leader is not None else None,
+        "top_muscles": {str(m): int(n) for m, n in counts.head(top).items()},
+    }
+
+def season_results(dataset: dict, year: int) -> dict:
+    """The per-season tables every viewer of that season is shown."""
+    members = season_slice(dataset["cube"]["members"], year)
+    muscles = season_rows(dataset["muscles"], dataset["muscle_bounds"], year)
+    counts = count_muscles(muscles)
+    return {
+        "leaderboard": leaderboard(members),
+        "hours": (
+            pd.DataFrame({"User": members.index, "Hours": members["hours"]})
+            .sort_values("Hours", ascending=False)
+            if len(members) else pd.DataFrame({"User": [], "Hours": []})
+        ),
+        "muscles": pd.DataFrame({"Muscle": counts.index, "Count": counts.values}),
+        "daily": season_slice(dataset["cube"]["daily"], year).reset_index(),
+        "summary": season_summary(dataset, year),
+    }
+
+# -------------------------------------------------------------
+#             SEASON RESULTS SNAPSHOT (VERSIONED)
+# -------------------------------------------------------------
+# season_results for every season, written once per data version to
+# <store>/results/<version>/ as Parquet tables plus a manifest.json with
+# the data version, the source's SHA-256 and a checksum per file. results/latest.json names
+# the newest complete version, so readers (the app, bots, wall displays)
+# load finished numbers without touching the sheet or pandas parsing.
+RESULT_TABLES = ("leaderboard", "hours", "muscles", "daily")
+# bumped whenever the tables change meaning for the same data version
+RESULT_FORMAT = 2
+RESULT_VERSIONS_KEPT = 3
+
+def results_dir(store: Path) -> Path:
+    return store / "results"
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def write_results(store: Path, dataset: dict) -> Path | None:
+    root = results_dir(store)
+    version = dataset["hash"][:16]
+    target = root / version
+    try:
+        on_disk = json.loads((target / "manifest.json").read_text()).get("format") == RESULT_FORMAT
+    except (OSError, ValueError):
+        on_disk = False
+    if not on_disk and _write_version(root, target, dataset) is None:
+        return None
+    try:
+        # the version may be on disk from before (A -> B -> A): it is the
+        # live one again, so name it in latest.json and make it the newest
+        # for pruning below
+        os.utime(target)
+        latest = root / "latest.json.tmp"
+        latest.write_text(json.dumps({"version": version, "sha256": dataset["hash"]}))
+        os.replace(latest, root / "latest.json")
+    except OSError:
+        return None
+    # keep a few versions for readers still holding an older manifest
+    versions = sorted((d for d in root.iterdir() if d.is_dir() and not d.name.startswith(".")),
+                      key=lambda d: d.stat().st_mtime, reverse=True)
+    for old in versions[RESULT_VERSIONS_KEPT:]:
+        for f in old.iterdir():
+            f.unlink()
+        old.rmdir()
+    return target
+
+def _write_version(root: Path, target: Path, dataset: dict) -> Path | None:
+    version = target.name
+    tmp = root / f".{version}.tmp"
+    manifest = {
+        "version": version,
+        "format": RESULT_FORMAT,
+        "sha256": dataset["hash"],
+        "source_sha256": dataset["source_hash"],
+        "rows": len(dataset["df"]),
+        "seasons": {},
+        "files": {},
+    }
+    try:
+        tmp.mkdir(parents=True, exist_ok=True)
+        for year, results in dataset["seasons"].items():
+            manifest["seasons"][str(year)] = results["summary"]
+            for name in RESULT_TABLES:
+                path = tmp / f"{year}_{name}.parquet"
+                results[name].to_parquet(path, index=False)
+                manifest["files"][path.name] = _file_sha256(path)
+        (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2, default=str))
+        if target.exists():
+            shutil.rmtree(target)  # written by an older RESULT_FORMAT
+        os.replace(tmp, target)
+    except (OSError, ValueError, ImportError):
+        # like the row snapshot, an accelerator: never fail a refresh over it
+        return None
+    finally:
+        if tmp.exists():
+            for f in tmp.iterdir():
+                f.unlink()
+            tmp.rmdir()
+    return target
+
+def read_results(store: Path, data_hash: str | None = None) -> dict | None:
+    """Season results of the latest version (or of data_hash), checksums verified.
+
+    Returns {year: {"leaderboard", "hours", "muscles", "daily", "summary"}},
+    or None if there is no complete matching version.
+    """
+    root = results_dir(store)
+    try:
+        if data_hash is None:
+            data_hash = json.loads((root / "latest.json").read_text())["sha256"]
+        folder = root / data_hash[:16]
+        manifest = json.loads((folder / "manifest.json").read_text())
+        if manifest["sha256"] != data_hash or manifest.get("format") != RESULT_FORMAT:
+            return None
+        seasons = {}
+        for year, summary in manifest["seasons"].items():
+            results = {"summary": summary}
+            for name in RESULT_TABLES:
+                path = folder / f"{year}_{name}.parquet"
+                if _file_sha256(path) != manifest["files"][path.name]:
+                    return None
+                results[name] = pd.read_parquet(path)
+            seasons[int(year)] = results
+    except (OSError, ValueError, KeyError):
+        return None
+    return seasons
+
+# -------------------------------------------------------------
+#             COMMAND LINE
+# -------------------------------------------------------------
+def main(argv=None):
+    """Season summaries and leaderboards from a local export, no browser needed.
+
+        python -m bekfe_core responses.csv
+        python -m bekfe_core responses.csv --season 2025 --json > 2025.json
+        python -m bekfe_core responses.csv --store .bekfe_store
+    """
+    parser = argparse.ArgumentParser(description=main.__doc__.splitlines()[0])
+    parser.add_argument("path", help="local .csv or .parquet export of the form responses")
+    parser.add_argument("--season", type=int, nargs="+", help="seasons to report (default: all)")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of tables")
+    parser.add_argument("--store", type=Path,
+                        help="also write the versioned season results snapshot under this directory")
+    args = parser.parse_args(argv)
+
+    dataset = load_file(args.path)
+    if args.store is not None:
+        written = write_results(args.store, dataset)
+        print(f"results snapshot: {written or 'not written'}", file=sys.stderr)
+    seasons = args.season or sorted(dataset["seasons"])
+    report = {
+        year: dataset["seasons"].get(year) or season_results(dataset, year)
+        for year in seasons
+    }
+
+    if args.json:
+        print(json.dumps({
+            str(year): {"summary": r["summary"], "leaderboard": r["leaderboard"].to_dict("records")}
+            for year, r in report.items()
+        }, indent=2, default=str))
+        return
+    for year, r in report.items():
+        s = r["summary"]
+        print(f"== Season {year}: {s['sessions']} sessions, {s['hours']} h, "
+              f"{s['members']} members, {s['active_days']} active days")
+        if s["top_member"] is not None:
+            print(f"   top: {s['top_member']} ({s['top_member_rank']}-Rank); "
+                  f"muscles: {', '.join(s['top_muscles'])}")
+        print(r["leaderboard"].to_string(index=False))
+        print()
+
+
+if __name__ == "__main__":
+    main()
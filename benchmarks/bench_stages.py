@@ -0,0 +1,137 @@
+"""Stage-level benchmark of the tracker's data pipeline.
+
+Generates synthetic form data (see benchmarks.synthetic) and times each
+stage of bekfe_core on it separately, reporting wall time, throughput and
+peak traced memory per stage.
+
+    python -m benchmarks.bench_stages --rows 100000 --members 50
+    python -m benchmarks.bench_stages --rows 1000 10000 100000 --reference
+"""
+import argparse
+import io
+import time
+import tracemalloc
+
+import pandas as pd
+
+import bekfe_core as core
+from benchmarks.synthetic import generate_csv
+
+
+def _stages(raw: bytes, reference: bool):
+    """Yield (stage name, callable) pairs; each callable feeds the next one."""
+    state = {}
+
+    def load():
+        state["df"] = pd.read_csv(io.BytesIO(raw))
+        state["df"].columns = [c.strip() for c in state["df"].columns]
+
+    def dates():
+        df = state["df"]
+        df[df.columns[0]] = core.robust_to_datetime(df[df.columns[0]])
+        df["year"] = df[df.columns[0]].dt.year
+
+    def names():
+        df = state["df"]
+        df[df.columns[1]] = df[df.columns[1]].apply(core.clean_name)
+
+    def durations():
+        df = state["df"]
+        df["minutes"], _ = core.parse_durations(df[df.columns[4]])
+
+    def durations_reference():
+        df = state["df"]
+        expected = df[df.columns[4]].apply(core.parse_duration)
+        if not expected.equals(df["minutes"]):
+            raise AssertionError("parse_durations disagrees with parse_duration")
+
+    def compact():
+        state["df"] = core.compact_frame(core.sort_rows(state["df"]))
+
+    def muscles():
+        state["muscles"] = core.muscle_table(state["df"])
+
+    def activity():
+        state["activity"] = core.activity_matrix(state["df"])
+
+    def activity_stats():
+        core.activity_stats(state["activity"])
+
+    def aggregations():
+        # includes the stats and rank passes timed on their own below
+        state["cube"] = core.season_cube(state["df"], state["activity"])
+
+    def ranks():
+        df = state["df"]
+        rows = df[df["year"].notna()]
+        core.rank_progress(state["cube"]["members"]["sessions"])
+        core.rank_promotions(rows, rows["year"].astype(int))
+
+    yield "load", load
+    yield "date parse", dates
+    yield "name clean", names
+    yield "duration parse", durations
+    if reference:
+        yield "duration parse (apply)", durations_reference
+    yield "sort + compact", compact
+    yield "muscle extraction", muscles
+    yield "activity bitmap", activity
+    yield "activity stats", activity_stats
+    yield "aggregations", aggregations
+    yield "rank computation", ranks
+
+
+def run(rows: int, members: int, seed: int = 0, reference: bool = False, memory: bool = True) -> list[dict]:
+    raw = generate_csv(rows, members, seed=seed)
+    results = []
+    for name, stage in _stages(raw, reference):
+        if memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        stage()
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append({
+            "rows": rows,
+            "members": members,
+            "stage": name,
+            "seconds": elapsed,
+            "rows_per_s": rows / elapsed if elapsed else float("inf"),
+            "peak_mb": peak / 2**20,
+        })
+    return results
+
+
+def report(results: list[dict]) -> str:
+    lines = [f"{'rows':>10} {'members':>8}  {'stage':<24} {'seconds':>9} {'rows/s':>12} {'peak MB':>9}"]
+    for r in results:
+        lines.append(
+            f"{r['rows']:>10} {r['members']:>8}  {r['stage']:<24} {r['seconds']:>9.4f} "
+            f"{r['rows_per_s']:>12,.0f} {r['peak_mb']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--members", type=int, nargs="+", default=[12])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reference", action="store_true",
+                        help="also time the per-row parse_duration and check it agrees")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip tracemalloc (it slows down Python-level stages)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for rows in args.rows:
+        for members in args.members:
+            results += run(rows, members, args.seed, args.reference, not args.no_memory)
+    print(report(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Synthetic Team Bekfè form data.
+
+Produces a CSV with the same layout as the Google Form export that
+teambekfe.py reads (timestamp, name, gender, muscles, duration), including
+the mess real answers have: name typos, mixed duration formats, muscles with
+parenthesised details and a few unparseable values.
+
+    python -m benchmarks.synthetic --rows 100000 --members 50 --out data.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Timestamp", "Name", "Gender", "Muscles Trained", "Duration"]
+
+KNOWN_NAMES = [
+    "Vincent", "Alain", "Danimix", "Dimitri", "Douglas",
+    "Louis", "Bousik", "Gregory", "Mikael", "Junior",
+]
+
+MUSCLES = [
+    "Chest", "Back", "Shoulders", "Biceps", "Triceps", "Legs", "Glutes",
+    "Abs", "Calves", "Forearms", "Cardio",
+]
+DETAILS = ["", "", "", " (upper)", " (lower)", " (light)", " (heavy day)"]
+
+DURATIONS = [
+    "1h", "1h 30m", "1 hour", "2 hours", "1hr 15min", "45 min", "45m", "90 min",
+    "30", "45", "60", "1 30", "1 15", "2h", "1h30", "50 mins", "", "??", "long",
+]
+
+
+def _messy(names: np.ndarray, rng: np.random.Generator) -> pd.Series:
+    # the same person typed five different ways, like the real sheet; every
+    # variant must clean back to the same member (bekfe_core.clean_name)
+    out = pd.Series(names, dtype=object)
+    style = rng.integers(0, 6, len(out))
+    out[style == 1] = out[style == 1].str.lower()
+    out[style == 2] = out[style == 2].str.upper()
+    out[style == 3] = " " + out[style == 3] + " "
+    out[style == 4] = out[style == 4] + "!"
+    out[style == 5] = out[style == 5].str.swapcase()
+    return out
+
+
+def member_pool(members: int) -> np.ndarray:
+    extra = [f"Member {i}" for i in range(max(0, members - len(KNOWN_NAMES)))]
+    return np.array((KNOWN_NAMES + extra)[:members], dtype=object)
+
+
+def generate(rows: int, members: int = 12, years: tuple[int, ...] = (2024, 2025, 2026),
+             seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    # timestamps spread across the seasons, in the sheet's M/D/YYYY H:MM:SS form
+    start = pd.Timestamp(min(years), 1, 1).value // 10**9
+    end = pd.Timestamp(max(years), 12, 31, 23, 59).value // 10**9
+    ts = pd.Series(pd.to_datetime(np.sort(rng.integers(start, end, rows)), unit="s")).dt
+    stamps = (
+        ts.month.astype(str) + "/" + ts.day.astype(str) + "/" + ts.year.astype(str) + " "
+        + ts.hour.astype(str) + ":" + ts.minute.astype(str).str.zfill(2)
+        + ":" + ts.second.astype(str).str.zfill(2)
+    )
+
+    # a few heavy users and a long tail, like a real team
+    pool = member_pool(members)
+    weights = rng.pareto(1.5, len(pool)) + 1
+    names = _messy(rng.choice(pool, rows, p=weights / weights.sum()), rng)
+
+    # 1-3 muscles per entry, some with "(...)" details
+    picks = rng.choice(MUSCLES, (rows, 3))
+    details = rng.choice(DETAILS, (rows, 3))
+    counts = rng.integers(1, 4, rows)
+    parts = pd.DataFrame(np.char.add(picks.astype(str), details.astype(str)))
+    muscles = parts[0]
+    muscles = muscles.where(counts < 2, muscles + ", " + parts[1])
+    muscles = muscles.where(counts < 3, muscles + ", " + parts[2])
+
+    return pd.DataFrame({
+        COLUMNS[0]: stamps.to_numpy(),
+        COLUMNS[1]: names.to_numpy(),
+        COLUMNS[2]: rng.choice(["Male", "Female"], rows),
+        COLUMNS[3]: muscles.to_numpy(),
+        COLUMNS[4]: rng.choice(DURATIONS, rows),
+    })
+
+
+def generate_csv(rows: int, members: int = 12, years: tuple[int, ...] = (2024, 2025, 2026),
+                 seed: int = 0) -> bytes:
+    return generate(rows, members, years, seed).to_csv(index=False).encode()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--members", type=int, default=12)
+    parser.add_argument("--years", type=int, nargs="+", default=[2024, 2025, 2026])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="synthetic.csv")
+    args = parser.parse_args(argv)
+
+    raw = generate_csv(args.rows, args.members, tuple(args.years), args.seed)
+    with open(args.out, "wb") as f:
+        f.write(raw)
+    print(f"wrote {args.rows} rows for {args.members} members to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
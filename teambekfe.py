@@ -1,10 +1,24 @@
 import streamlit as st
-import streamlit.components.v1 as components
 import pandas as pd
-import plotly.express as px
+import contextlib
 import datetime as dt
-import re
-from collections import defaultdict
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from bekfe_core import (
+    RANK_MAX, RANKS, DatasetCache, annotate, build_dataset, count_muscles, fetch_source, new_source_state,
+    profile_records, profiling, season_results, season_rows, season_slice, snapshot_hash, source_format,
+    stage, start_profile, stop_profile, weekly_buckets, write_results,
+)
+
+# plotly.express and streamlit.components are imported where they are used:
+# figures are cached, so most reruns never need plotly.express at all.
 
 # -------------------------------------------------------------
 #                PAGE CONFIG
@@ -14,6 +28,47 @@ st.set_page_config(
     layout="wide",
 )
 
+# -------------------------------------------------------------
+#                DIAGNOSTICS (STAGE TIMINGS)
+# -------------------------------------------------------------
+# Every rerun records wall time per pipeline stage and tab. BEKFE_PROFILE=1
+# also traces memory and logs one JSON line per rerun; the panel at the
+# bottom of the page shows with BEKFE_PROFILE=1 or ?diagnostics=1.
+PROFILE = os.environ.get("BEKFE_PROFILE", "") not in ("", "0")
+SHOW_DIAGNOSTICS = PROFILE or st.query_params.get("diagnostics", "") not in ("", "0")
+profile_log = logging.getLogger("bekfe.profile")
+
+if PROFILE and not profile_log.handlers:
+    profile_log.addHandler(logging.StreamHandler())
+    profile_log.setLevel(logging.INFO)
+if PROFILE and not tracemalloc.is_tracing():
+    tracemalloc.start()
+start_profile()
+
+def log_timings(event: str, timings: list[dict], **fields) -> None:
+    profile_log.info(json.dumps({
+        "event": event,
+        **fields,
+        "total_ms": round(sum(r.get("ms", 0) for r in timings if r["depth"] == 0), 2),
+        "stages": timings,
+    }))
+
+@contextlib.contextmanager
+def fragment_stage(name: str):
+    # a fragment rerun skips the top of the script, so it profiles itself
+    if profiling():
+        with stage(name) as rec:
+            yield rec
+        return
+    start_profile()
+    try:
+        with stage(name) as rec:
+            yield rec
+    finally:
+        timings = stop_profile()
+        if PROFILE:
+            log_timings("fragment", timings)
+
 # -------------------------------------------------------------
 #                GLOBAL STYLING (SOLO-LEVELING THEME)
 # -------------------------------------------------------------
@@ -86,14 +141,169 @@ CSV_URL = (
     "1XQEJH-s0Z6LrutwTTSvS0cYR1e3Tiqi6VqUkGQ-S3Lg/export"
     "?format=csv&gid=2121731071"
 )
-
-@st.cache_data(ttl=300)
-def load_data():
-    _df = pd.read_csv(CSV_URL)
-    _df.columns = [c.strip() for c in _df.columns]
-    return _df
-
-df = load_data()
+FORM_URL = "https://docs.google.com/forms/d/1JqTx8Fd5la2BGv4h5s1506KZMVQUqHL2U0pNvKs0KTo/edit"
+
+# -------------------------------------------------------------
+#             DATA SOURCE (SHEETS URL, HTTP ENDPOINT OR LOCAL FILE)
+# -------------------------------------------------------------
+# BEKFE_SOURCE can point at any http(s) URL or a local .csv/.parquet path,
+# e.g. a stand-in server or an export for offline runs and benchmarks.
+DATA_SOURCE = os.environ.get("BEKFE_SOURCE", CSV_URL)
+FETCH_TIMEOUT = float(os.environ.get("BEKFE_FETCH_TIMEOUT", "20"))
+FETCH_WORKERS = int(os.environ.get("BEKFE_FETCH_WORKERS", "4"))
+REFRESH_SECONDS = 300
+
+# -------------------------------------------------------------
+#             LOCAL SNAPSHOT (APPEND-ONLY INCREMENTAL INGEST)
+# -------------------------------------------------------------
+# Parsed rows are kept under BEKFE_STORE_DIR so a refresh only parses rows
+# appended since the last one (see bekfe_core.read_snapshot), next to the
+# versioned per-season results (bekfe_core.write_results). With the source
+# down, a fresh process starts from both without recomputing anything.
+STORE_DIR = Path(os.environ.get("BEKFE_STORE_DIR", ".bekfe_store"))
+# categorical text, small ints, timestamp-ordered rows (bekfe_core.compact_frame)
+COMPACT = os.environ.get("BEKFE_COMPACT", "1") != "0"
+
+# -------------------------------------------------------------
+#             TEAMS
+# -------------------------------------------------------------
+# One deployment can serve several teams. BEKFE_TEAMS names a JSON file:
+#
+#   {"bekfe": {"name": "Team Bekfè", "source": "https://...", "form": "https://...",
+#              "aliases": {"dani mix": "Danimix"}, "ttl": 300}, ...}
+#
+# and ?team=<id> picks one (the first is the default). Only "source" is
+# required. Without BEKFE_TEAMS there is a single team: BEKFE_SOURCE with
+# the built-in alias map, stored directly in BEKFE_STORE_DIR.
+TEAMS_FILE = os.environ.get("BEKFE_TEAMS", "")
+CACHE_MB = float(os.environ.get("BEKFE_CACHE_MB", "512"))
+
+def load_teams() -> dict[str, dict]:
+    if not TEAMS_FILE:
+        return {"bekfe": {
+            "name": "Team Bekfè", "source": DATA_SOURCE, "form": FORM_URL,
+            "aliases": None, "ttl": REFRESH_SECONDS, "store": STORE_DIR,
+        }}
+    teams = {}
+    for team_id, cfg in json.loads(Path(TEAMS_FILE).read_text()).items():
+        teams[team_id] = {
+            "name": cfg.get("name", team_id),
+            "source": cfg["source"],
+            "form": cfg.get("form"),
+            "aliases": cfg.get("aliases", {}),
+            "ttl": float(cfg.get("ttl", REFRESH_SECONDS)),
+            "store": STORE_DIR / team_id,
+        }
+    return teams
+
+TEAMS = load_teams()
+team_id = st.query_params.get("team", next(iter(TEAMS)))
+if team_id not in TEAMS:
+    st.error(f"Unknown team '{team_id}'. Available: {', '.join(TEAMS)}")
+    st.stop()
+team = TEAMS[team_id]
+
+# -------------------------------------------------------------
+#             SHARED DATASETS (STALE-WHILE-REVALIDATE, ALL TEAMS)
+# -------------------------------------------------------------
+# Built datasets live in one process-wide cache shared by every session
+# and team (bekfe_core.DatasetCache): least recently viewed teams are
+# evicted past BEKFE_CACHE_MB, and hit/miss/eviction counts are kept.
+# A daemon thread looks for teams whose TTL has run out and re-checks their
+# sheets concurrently on a small thread pool, swapping in a new version only
+# once it is fully built, so reruns never wait on the network or a
+# re-parse. A session only loads synchronously when its team is not cached
+# (first view, or evicted). Each team has one lock, so at most one fetch +
+# parse per team is ever in flight.
+REFRESH_TICK = 30
+
+@st.cache_resource
+def shared_state() -> dict:
+    shared = {
+        "cache": DatasetCache(int(CACHE_MB * 2**20)),
+        "pool": ThreadPoolExecutor(FETCH_WORKERS, thread_name_prefix="bekfe-fetch"),
+        "teams": {t: {"lock": threading.Lock(), "source": new_source_state()} for t in TEAMS},
+    }
+    # warm every team's cache concurrently, then keep them fresh
+    for t in TEAMS:
+        shared["pool"].submit(refresh_job, shared, t)
+    threading.Thread(target=refresh_loop, args=(shared,), name="bekfe-refresh", daemon=True).start()
+    return shared
+
+def refresh_team(shared: dict, team_id: str, initial: bool = False) -> None:
+    cfg, slot, cache = TEAMS[team_id], shared["teams"][team_id], shared["cache"]
+    first = len(profile_records())
+    with slot["lock"]:
+        current = cache.peek(team_id)
+        if initial and current is not None:
+            return  # another session (or the warm-up) finished the load while we waited
+        with stage("fetch"):
+            raw, data_hash = fetch_source(cfg["source"], slot["source"], FETCH_TIMEOUT)
+        if raw is None:
+            if current is not None:
+                cache.renew(team_id)
+                return  # keep serving the last good version
+            data_hash = snapshot_hash(cfg["store"])
+            if data_hash is None:
+                return
+        if current is not None and data_hash == current["source_hash"]:
+            cache.renew(team_id)
+            return
+
+        started = time.perf_counter()
+        fmt = source_format(cfg["source"]) if raw is not None else "csv"
+        data = build_dataset(data_hash, raw, fmt, cfg["store"], COMPACT, cfg["aliases"], current)
+        data["built_at"] = dt.datetime.now()
+        data["build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        # viewers fetch the team's dataset once per rerun, so replacing the
+        # whole entry keeps every rerun on a single consistent version
+        cache.put(team_id, data, cfg["ttl"])
+        with stage("write results"):
+            write_results(cfg["store"], data)
+        # refreshes run in the background, so keep their stage timings with
+        # the version they built for the diagnostics panel
+        records = profile_records()[first:]
+        top = min((r["depth"] for r in records), default=0)
+        data["refresh_timings"] = [dict(r, depth=r["depth"] - top) for r in records]
+
+def refresh_job(shared: dict, team_id: str) -> None:
+    start_profile()
+    try:
+        refresh_team(shared, team_id)
+    except Exception:
+        # a bad refresh must not kill the worker; the old version stays up
+        logging.getLogger("bekfe").exception("refresh of team %s failed", team_id)
+    finally:
+        timings = stop_profile()
+    if PROFILE:
+        log_timings("refresh", timings, team=team_id)
+
+def refresh_loop(shared: dict) -> None:
+    while True:
+        time.sleep(REFRESH_TICK)
+        due = shared["cache"].expired()
+        wait([shared["pool"].submit(refresh_job, shared, t) for t in due])
+
+def load_data(team_id: str) -> dict:
+    shared = shared_state()
+    with stage("load_data") as rec:
+        rec["cache"] = "hit"
+        data = shared["cache"].get(team_id)
+        if data is None:
+            rec["cache"] = "miss"
+            refresh_team(shared, team_id, initial=True)
+            data = shared["cache"].peek(team_id)
+    if data is None:
+        error = shared["teams"][team_id]["source"]["error"]
+        st.error(f"Could not load the data source ({error}) and no local snapshot exists yet.")
+        st.stop()
+    return data
+
+dataset = load_data(team_id)
+df = dataset["df"]
+source_error = shared_state()["teams"][team_id]["source"]["error"]
+if source_error:
+    st.warning(f"Data source unreachable ({source_error}), showing the last loaded data.")
 
 # -------------------------------------------------------------
 #             COLUMN SETUP
@@ -103,59 +313,6 @@ col_name      = df.columns[1]
 col_muscles   = df.columns[3]
 col_duration  = df.columns[4]
 
-# -------------------------------------------------------------
-#             ROBUST DATE PARSE (2-PASS)
-# -------------------------------------------------------------
-def robust_to_datetime(series: pd.Series) -> pd.Series:
-    s1 = pd.to_datetime(series, errors="coerce", infer_datetime_format=True)
-    # If too many NaT, try dayfirst parse as a second attempt
-    if s1.isna().mean() > 0.20:
-        s2 = pd.to_datetime(series, errors="coerce", dayfirst=True)
-        # keep whichever parsed more values
-        if s2.notna().sum() > s1.notna().sum():
-            return s2
-    return s1
-
-df[col_timestamp] = robust_to_datetime(df[col_timestamp])
-df["year"] = df[col_timestamp].dt.year
-
-# -------------------------------------------------------------
-#             CLEAN NAME + DURATION
-# -------------------------------------------------------------
-def clean_name(n):
-    if not isinstance(n, str):
-        return ""
-    n = re.sub(r"[^a-z0-9 ]", "", n.lower().strip())
-    corrections = {
-        "vincent":"Vincent","alain":"Alain","danimix":"Danimix",
-        "dani mix":"Danimix","dimitri":"Dimitri","douglas":"Douglas",
-        "louis":"Louis","bousik":"Bousik","gregory":"Gregory",
-        "mikael":"Mikael","junior":"Junior"
-    }
-    return corrections.get(n, n.title())
-
-df[col_name] = df[col_name].apply(clean_name)
-
-def parse_duration(t):
-    if not isinstance(t, str):
-        return 0
-    t = t.lower()
-    h = re.search(r"(\d+)\s*(hour|hr|h)", t)
-    m = re.search(r"(\d+)\s*(min|m)", t)
-    hours = int(h.group(1)) if h else 0
-    mins  = int(m.group(1)) if m else 0
-
-    if not h and not m:
-        nums = re.findall(r"\d+", t)
-        if len(nums) == 1:
-            mins = int(nums[0])
-        elif len(nums) == 2:
-            hours = int(nums[0])
-            mins = int(nums[1])
-    return hours * 60 + mins
-
-df["minutes"] = df[col_duration].apply(parse_duration)
-
 # -------------------------------------------------------------
 #             SEASON SELECTOR (ALWAYS SHOW 2025 + 2026)
 # -------------------------------------------------------------
@@ -166,11 +323,12 @@ today = dt.date.today()
 # default: current year if exists, else max available
 default_year = today.year if today.year in available_years else max(available_years)
 
-st.markdown("<div class='main-title'>Team Bekfè Fitness Tracker</div>", unsafe_allow_html=True)
+st.markdown(f"<div class='main-title'>{team['name']} Fitness Tracker</div>", unsafe_allow_html=True)
 
-st.markdown("""
+if team["form"]:
+    st.markdown(f"""
 ### Log Your Fitness Sessions  
-<a href="https://docs.google.com/forms/d/1JqTx8Fd5la2BGv4h5s1506KZMVQUqHL2U0pNvKs0KTo/edit"
+<a href="{team['form']}"
 target="_blank"
 style="background:#0d1b2a;padding:10px 20px;border-radius:8px;
 border:1px solid #3ecbff;color:#aee6ff;font-size:16px;text-decoration:none;">
@@ -190,63 +348,26 @@ season_year = st.radio(
 # Debug expander (so you can confirm what the sheet actually contains)
 with st.expander("🔎 Debug: Year counts in your Google Sheet", expanded=False):
     st.dataframe(df["year"].value_counts(dropna=False).sort_index())
-
-df_season = df[df["year"] == season_year].copy()
-
-# -------------------------------------------------------------
-#             MUSCLE EXTRACTION
-# -------------------------------------------------------------
-def extract_muscles(txt):
-    if not isinstance(txt, str):
-        return []
-    return [x.split("(")[0].strip() for x in txt.split(",") if x.strip()]
-
-user_muscles = defaultdict(lambda: defaultdict(int))
-overall_muscles = defaultdict(int)
-
-for _, row in df_season.iterrows():
-    user = row[col_name]
-    muscs = extract_muscles(row[col_muscles])
-    for m in muscs:
-        user_muscles[user][m] += 1
-        overall_muscles[m] += 1
+    parse_stats = df.attrs.get("parse_stats", {})
+    st.write(f"Unparseable durations (counted as 0 min): {parse_stats.get('unparsed_durations', 0)}")
+    st.write("Timestamp rows per parse strategy:", parse_stats.get("date_strategies", {}))
+    st.write(f"In-memory dataset: {df.attrs.get('memory_mb', 0)} MB ({'compact' if COMPACT else 'plain'} layout)")
+    st.write(
+        f"Data version {dataset['hash'][:12]} built {dataset['built_at']:%H:%M:%S} "
+        f"in {dataset['build_ms']} ms (background refresh every {team['ttl']:g} s)"
+    )
+    st.write("Shared dataset cache (all teams):", shared_state()["cache"].info())
 
 # -------------------------------------------------------------
-#             METRICS (SAFE IF EMPTY)
+#             MUSCLE EXTRACTION (LONG FORMAT, ALL SEASONS)
 # -------------------------------------------------------------
-if len(df_season) > 0:
-    sessions = df_season.groupby(col_name).size()
-    duration = df_season.groupby(col_name)["minutes"].sum()
-
-    df_season["date"] = df_season[col_timestamp].dt.date
-    sessions_per_day = df_season.groupby("date").size().reset_index(name="sessions")
-    sessions_per_day["7day_avg"] = sessions_per_day["sessions"].rolling(7, 1).mean()
-
-    users = sorted(df_season[col_name].dropna().unique())
-else:
-    sessions = pd.Series(dtype=int)
-    duration = pd.Series(dtype=int)
-    sessions_per_day = pd.DataFrame({"date": [], "sessions": [], "7day_avg": []})
-    users = []
-
-mus_df = pd.DataFrame({"Muscle": list(overall_muscles.keys()), "Count": list(overall_muscles.values())})
-hours_df = (
-    pd.DataFrame({"User": duration.index, "Hours": (duration/60).round(1)})
-    .sort_values("Hours", ascending=False)
-    if len(duration) else pd.DataFrame({"User": [], "Hours": []})
-)
+# Built once per sheet version (see bekfe_core.muscle_table).
+muscle_long = dataset["muscles"]
+muscle_season = season_rows(muscle_long, dataset["muscle_bounds"], season_year)
 
 # -------------------------------------------------------------
 #               RANK SYSTEM LOGIC
 # -------------------------------------------------------------
-def get_rank_letter(n):
-    if n >= 250: return "S"
-    if n >= 180: return "A"
-    if n >= 120: return "B"
-    if n >= 60:  return "C"
-    if n >= 30:  return "D"
-    return "E"
-
 RANK_CONFIG = {
     "S": {"label":"S-Rank Athlete","color":"#e9d5ff","emoji":"👑"},
     "A": {"label":"A-Rank Athlete","color":"#93c5fd","emoji":"💎"},
@@ -260,22 +381,73 @@ def render_rank_badge(letter):
     cfg = RANK_CONFIG[letter]
     return f"<span style='color:{cfg['color']};font-weight:800;'>{cfg['emoji']} {cfg['label']}</span>"
 
-if len(sessions) > 0:
-    consistency_map = {u: round((int(sessions[u]) / 365) * 100, 1) for u in sessions.index}
-    rank_map = {u: get_rank_letter(int(sessions[u])) for u in sessions.index}
-    top_user = sessions.idxmax()
-    top_user_rank_letter = rank_map[top_user]
-    top_user_sessions = int(sessions[top_user])
-else:
-    consistency_map = {}
-    rank_map = {}
-    top_user = None
-    top_user_rank_letter = "E"
-    top_user_sessions = 0
+# -------------------------------------------------------------
+#             SEASON x MEMBER AGGREGATES (PER DATA VERSION)
+# -------------------------------------------------------------
+# Computed once per sheet version (see bekfe_core.season_cube).
+cube = dataset["cube"]
+season_members = season_slice(cube["members"], season_year)
+df_season = season_rows(df, cube["bounds"], season_year)
+
+# -------------------------------------------------------------
+#             METRICS (SAFE IF EMPTY)
+# -------------------------------------------------------------
+# precomputed per data version (bekfe_core.season_results); only seasons
+# without any data yet, like a forced upcoming year, are built here
+results = dataset["seasons"].get(season_year) or season_results(dataset, season_year)
+lb, hours_df, mus_df = results["leaderboard"], results["hours"], results["muscles"]
+sessions_per_day = results["daily"]
+
+# -------------------------------------------------------------
+#                PAGED TABLES
+# -------------------------------------------------------------
+# Long tables are windowed on the server: only the visible page is sent to
+# the browser. Callers pass rows that are already in display order.
+PAGE_SIZES = [10, 25, 50, 100]
+
+def page_window(total: int, key: str) -> slice:
+    c1, c2, c3 = st.columns([1, 1, 3])
+    size = c1.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_size")
+    pages = max(1, -(-total // size))
+    # session state is the widget's only source of truth: seeded once, then
+    # clamped, since a new member/season can have fewer pages than the last
+    st.session_state.setdefault(f"{key}_page", 1)
+    if st.session_state[f"{key}_page"] > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = c2.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    c3.caption(f"{total} entries · page {page} of {pages}")
+    start = (page - 1) * size
+    return slice(start, start + size)
+
+# -------------------------------------------------------------
+#                FIGURE CACHE
+# -------------------------------------------------------------
+# Figures are built once per (chart, data version, season, member) and
+# shared by all sessions; the least recently used are dropped past
+# FIGURE_CACHE_SIZE. Daily series longer than MAX_DAILY_POINTS are drawn
+# as weekly buckets (bekfe_core.weekly_buckets) to keep the payload small.
+FIGURE_CACHE_SIZE = int(os.environ.get("BEKFE_FIGURE_CACHE", "64"))
+MAX_DAILY_POINTS = int(os.environ.get("BEKFE_MAX_DAILY_POINTS", "200"))
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE)
+def cached_figure(chart: str, data_hash: str, season: int, member: str | None, _build):
+    # shared object: callers only hand it to st.plotly_chart, never mutate it
+    import plotly.express as px
+    annotate(cache="miss")
+    return _build(px)
+
+def plot(chart: str, season: int, member: str | None, build) -> None:
+    with stage(f"figure: {chart}") as rec:
+        rec["cache"] = "hit"
+        fig = cached_figure(chart, df.attrs["data_hash"], season, member, build)
+    st.plotly_chart(fig, use_container_width=True)
 
 # -------------------------------------------------------------
 #                TABS
 # -------------------------------------------------------------
+# Each tab body is a fragment: its own widgets (member picker, table pages)
+# rerun just that tab, with the inputs the last full run passed in. Changing
+# the season still reruns the script, which only re-slices cached data.
 tab_profile, tab_lb, tab_activity, tab_dash, tab_ranks = st.tabs(
     ["Profile", "Leaderboards", "Fitness Activity", "Dashboard", "Ranking System"]
 )
@@ -283,180 +455,216 @@ tab_profile, tab_lb, tab_activity, tab_dash, tab_ranks = st.tabs(
 # -------------------------------------------------------------
 #                PROFILE TAB
 # -------------------------------------------------------------
-with tab_profile:
-    st.markdown("<div class='glow-header'>Profile</div>", unsafe_allow_html=True)
-
-    if len(df_season) == 0:
-        st.warning(f"No data for {season_year} yet. Add sessions with {season_year} timestamps to populate this season.")
-    else:
-        featured_html = render_rank_badge(top_user_rank_letter)
-        st.markdown(
-            f"<div class='featured-line'>🏆 Featured Athlete: <b>{top_user}</b> – {featured_html} – <b>{top_user_sessions}</b> sessions</div>",
-            unsafe_allow_html=True
-        )
-
-        selected = st.selectbox("Select Member", users, index=users.index(top_user))
-
-        total_sessions_user = int(sessions[selected])
-        total_minutes_user = int(duration[selected])
-        total_hours_user = round(total_minutes_user / 60, 1)
-        consistency_user = consistency_map.get(selected, 0)
-        rank_letter_user = rank_map.get(selected, "E")
-        rank_html = render_rank_badge(rank_letter_user)
-
-        # Season summary
-        if season_year == today.year:
-            season_date = today
-            season_end = dt.date(season_year, 12, 31)
-            days_left = (season_end - season_date).days
-            season_status = f"Ends in: {days_left} days"
-        else:
-            season_date = dt.date(season_year, 12, 31)
-            days_left = 0
-            season_status = "Season complete ✅"
+@st.fragment
+def render_profile(season_year, season_members, df_season, muscle_season, member_rows, muscle_rows):
+    with fragment_stage("tab: Profile"):
+        st.markdown("<div class='glow-header'>Profile</div>", unsafe_allow_html=True)
 
-        st.markdown(
-            f"<div class='summary-line'><b>Season:</b> {season_year} | "
-            f"<b>Date:</b> {season_date} | <b>{season_status}</b></div>",
-            unsafe_allow_html=True
-        )
-
-        st.markdown(f"<div class='sub-header'>{selected} – {rank_html}</div>", unsafe_allow_html=True)
+        if len(df_season) == 0:
+            st.warning(f"No data for {season_year} yet. Add sessions with {season_year} timestamps to populate this season.")
+        else:
+            sessions = season_members["sessions"]
+            duration = season_members["minutes"]
+            users = list(season_members.index)
+            top_user = sessions.idxmax()
+            top_user_rank_letter = season_members.at[top_user, "rank"]
+            top_user_sessions = int(sessions[top_user])
+
+            featured_html = render_rank_badge(top_user_rank_letter)
+            st.markdown(
+                f"<div class='featured-line'>🏆 Featured Athlete: <b>{top_user}</b> – {featured_html} – <b>{top_user_sessions}</b> sessions</div>",
+                unsafe_allow_html=True
+            )
 
-        c1, c2, c3, c4 = st.columns(4)
-        c1.markdown(f"<div class='stat-box'><div class='stat-value'>{total_sessions_user}</div><div class='stat-label'>Total Sessions</div></div>", unsafe_allow_html=True)
-        c2.markdown(f"<div class='stat-box'><div class='stat-value'>{total_hours_user}</div><div class='stat-label'>Total Hours</div></div>", unsafe_allow_html=True)
-        c3.markdown(f"<div class='stat-box'><div class='stat-value'>{days_left}</div><div class='stat-label'>Days Left</div></div>", unsafe_allow_html=True)
-        c4.markdown(f"<div class='stat-box'><div class='stat-value'>{consistency_user}%</div><div class='stat-label'>Season Consistency</div></div>", unsafe_allow_html=True)
+            selected = st.selectbox("Select Member", users, index=users.index(top_user))
+
+            member = season_members.loc[selected]
+            total_sessions_user = int(sessions[selected])
+            total_minutes_user = int(duration[selected])
+            total_hours_user = round(total_minutes_user / 60, 1)
+            consistency_user = member["consistency"]
+            rank_html = render_rank_badge(member["rank"])
+
+            # Season summary
+            if season_year == today.year:
+                season_date = today
+                season_end = dt.date(season_year, 12, 31)
+                days_left = (season_end - season_date).days
+                season_status = f"Ends in: {days_left} days"
+            else:
+                season_date = dt.date(season_year, 12, 31)
+                days_left = 0
+                season_status = "Season complete ✅"
+
+            st.markdown(
+                f"<div class='summary-line'><b>Season:</b> {season_year} | "
+                f"<b>Date:</b> {season_date} | <b>{season_status}</b></div>",
+                unsafe_allow_html=True
+            )
 
-        # Progress bar
-        st.markdown("<div class='sub-header'>📈 Progress to Next Rank</div>", unsafe_allow_html=True)
+            st.markdown(f"<div class='sub-header'>{selected} – {rank_html}</div>", unsafe_allow_html=True)
+
+            c1, c2, c3, c4 = st.columns(4)
+            c1.markdown(f"<div class='stat-box'><div class='stat-value'>{total_sessions_user}</div><div class='stat-label'>Total Sessions</div></div>", unsafe_allow_html=True)
+            c2.markdown(f"<div class='stat-box'><div class='stat-value'>{total_hours_user}</div><div class='stat-label'>Total Hours</div></div>", unsafe_allow_html=True)
+            c3.markdown(f"<div class='stat-box'><div class='stat-value'>{days_left}</div><div class='stat-label'>Days Left</div></div>", unsafe_allow_html=True)
+            c4.markdown(f"<div class='stat-box'><div class='stat-value'>{consistency_user}%</div><div class='stat-label'>Season Consistency</div></div>", unsafe_allow_html=True)
+
+            # Training cadence (bekfe_core.activity_stats)
+            c5, c6, c7, c8 = st.columns(4)
+            c5.markdown(f"<div class='stat-box'><div class='stat-value'>{member['streak']}</div><div class='stat-label'>Current Streak (days)</div></div>", unsafe_allow_html=True)
+            c6.markdown(f"<div class='stat-box'><div class='stat-value'>{member['best_streak']}</div><div class='stat-label'>Longest Streak (days)</div></div>", unsafe_allow_html=True)
+            c7.markdown(f"<div class='stat-box'><div class='stat-value'>{member['rate_7d']}%</div><div class='stat-label'>Last 7 Days</div></div>", unsafe_allow_html=True)
+            c8.markdown(f"<div class='stat-box'><div class='stat-value'>{member['rate_30d']}%</div><div class='stat-label'>Last 30 Days</div></div>", unsafe_allow_html=True)
+            st.caption(f"Trained on {member['active_days']} different days this season; consistency and "
+                       "rolling rates count calendar days up to the team's latest entry.")
+
+            # Progress bar
+            st.markdown("<div class='sub-header'>📈 Progress to Next Rank</div>", unsafe_allow_html=True)
+
+            progress = member["progress"]
+            next_rank, next_threshold = member["next_rank"], member["next_at"]
+
+            st.markdown(f"""
+                <style>
+                @keyframes manaFill {{
+                    from {{ width: 0%; }}
+                    to {{ width: {progress*100}%; }}
+                }}
+                .mana-bar {{
+                    width: 100%; height: 20px; background: #0a0f1a;
+                    border-radius: 10px; border: 1px solid #3fa9ff;
+                    overflow: hidden; margin-bottom: 12px;
+                }}
+                .mana-fill {{
+                    height: 100%;
+                    background: linear-gradient(90deg, #1e90ff, #00e1ff);
+                    animation: manaFill 1.8s ease-out forwards;
+                }}
+                </style>
+
+                <div class="mana-bar"><div class="mana-fill"></div></div>
+            """, unsafe_allow_html=True)
+
+            st.write(f"**{total_sessions_user} / {next_threshold} sessions to reach {next_rank or 'MAX'} Rank**")
+            if member["promoted_on"] is not None:
+                st.caption(f"Promoted to {member['rank']}-Rank on {member['promoted_on']}")
+
+            # Muscles + Log
+            st.markdown("<div class='sub-header'>💪 Top Muscles Used</div>", unsafe_allow_html=True)
+            user_muscles = count_muscles(muscle_season.iloc[muscle_rows.get(selected, [])])
+            top_df = user_muscles.sort_values(ascending=False).head(5)
+            st.dataframe(pd.DataFrame({"Muscle": top_df.index, "Count": top_df.values}), hide_index=True)
+
+            st.markdown("<div class='sub-header'>📘 Workout Log</div>", unsafe_allow_html=True)
+            log_rows = member_rows.get(selected, [])
+            window = page_window(len(log_rows), "log")
+            log = df_season.iloc[log_rows[window]][[col_timestamp, col_muscles, col_duration]]
+            st.dataframe(log, hide_index=True)
+
+            # Monthly consistency
+            st.markdown("<div class='sub-header'>📉 Monthly Training Consistency</div>", unsafe_allow_html=True)
+            def monthly_figure(px):
+                user_ts = df_season[col_timestamp].iloc[log_rows]
+                monthly_sessions = (
+                    pd.DataFrame({"month": user_ts.dt.month, "Month": user_ts.dt.strftime("%B")})
+                    .groupby(["month", "Month"]).size().reset_index(name="Sessions").sort_values("month")
+                )
+                return (
+                    px.bar(monthly_sessions, x="Month", y="Sessions", text="Sessions", title=None)
+                    .update_traces(textposition="outside")
+                    .update_layout(yaxis_title="Sessions", xaxis_title="")
+                )
+
+            if len(log_rows) == 0:
+                st.info("No monthly data for this user in this season yet.")
+            else:
+                plot("monthly sessions", season_year, selected, monthly_figure)
 
-        rank_thresholds = {"S":250, "A":180, "B":120, "C":60, "D":30, "E":0}
-        order = ["E", "D", "C", "B", "A", "S"]
+with tab_profile:
+    render_profile(season_year, season_members, df_season, muscle_season,
+                   cube["member_rows"].get(season_year, {}), dataset["muscle_rows"].get(season_year, {}))
 
-        current_rank = rank_letter_user
-        current_count = total_sessions_user
+# -------------------------------------------------------------
+#                LEADERBOARD TAB
+# -------------------------------------------------------------
+@st.fragment
+def render_leaderboard(season_year, lb):
+    with fragment_stage("tab: Leaderboards"):
+        st.markdown("<div class='glow-header'>Leaderboards</div>", unsafe_allow_html=True)
 
-        if current_rank == "S":
-            next_rank = None
-            next_threshold = 365
-        else:
-            next_rank = order[order.index(current_rank) + 1]
-            next_threshold = rank_thresholds[next_rank]
-
-        current_threshold = rank_thresholds[current_rank]
-        denom = (next_threshold - current_threshold) if (next_threshold - current_threshold) != 0 else 1
-        progress = (current_count - current_threshold) / denom
-        progress = max(0, min(progress, 1))
-
-        st.markdown(f"""
-            <style>
-            @keyframes manaFill {{
-                from {{ width: 0%; }}
-                to {{ width: {progress*100}%; }}
-            }}
-            .mana-bar {{
-                width: 100%; height: 20px; background: #0a0f1a;
-                border-radius: 10px; border: 1px solid #3fa9ff;
-                overflow: hidden; margin-bottom: 12px;
-            }}
-            .mana-fill {{
-                height: 100%;
-                background: linear-gradient(90deg, #1e90ff, #00e1ff);
-                animation: manaFill 1.8s ease-out forwards;
-            }}
-            </style>
-
-            <div class="mana-bar"><div class="mana-fill"></div></div>
-        """, unsafe_allow_html=True)
-
-        st.write(f"**{current_count} / {next_threshold} sessions to reach {next_rank or 'MAX'} Rank**")
-
-        # Muscles + Log
-        st.markdown("<div class='sub-header'>💪 Top Muscles Used</div>", unsafe_allow_html=True)
-        top_df = pd.Series(user_muscles[selected]).sort_values(ascending=False).head(5)
-        st.dataframe(top_df.reset_index().rename(columns={"index":"Muscle", 0:"Count"}), hide_index=True)
-
-        st.markdown("<div class='sub-header'>📘 Workout Log</div>", unsafe_allow_html=True)
-        log = df_season[df_season[col_name] == selected][[col_timestamp, col_muscles, col_duration]]
-        st.dataframe(log.sort_values(col_timestamp, ascending=False), hide_index=True)
-
-        # Monthly consistency
-        st.markdown("<div class='sub-header'>📉 Monthly Training Consistency</div>", unsafe_allow_html=True)
-        df_user = df_season[df_season[col_name] == selected].copy()
-        df_user["month"] = df_user[col_timestamp].dt.month
-        df_user["Month"] = df_user[col_timestamp].dt.strftime("%B")
-        monthly_sessions = (
-            df_user.groupby(["month", "Month"]).size().reset_index(name="Sessions").sort_values("month")
-        )
-
-        if len(monthly_sessions) == 0:
-            st.info("No monthly data for this user in this season yet.")
+        if len(lb) == 0:
+            st.info(f"No leaderboard data for season {season_year} yet.")
         else:
-            st.plotly_chart(
-                px.bar(monthly_sessions, x="Month", y="Sessions", text="Sessions", title=None)
-                .update_traces(textposition="outside")
-                .update_layout(yaxis_title="Sessions", xaxis_title=""),
-                use_container_width=True
+            st.dataframe(
+                lb, hide_index=True, use_container_width=True,
+                column_config={"To Next Rank": st.column_config.ProgressColumn(min_value=0, max_value=1, format="percent")},
             )
 
-# -------------------------------------------------------------
-#                LEADERBOARD TAB
-# -------------------------------------------------------------
 with tab_lb:
-    st.markdown("<div class='glow-header'>Leaderboards</div>", unsafe_allow_html=True)
-
-    if len(sessions) == 0:
-        st.info(f"No leaderboard data for season {season_year} yet.")
-    else:
-        lb = pd.DataFrame({
-            "User": sessions.index,
-            "Sessions": sessions.values,
-            "Hours": (duration.values/60).round(1),
-            "Consistency %": [consistency_map.get(u, 0) for u in sessions.index],
-            "Rank": [rank_map.get(u, "E") for u in sessions.index]
-        }).sort_values("Sessions", ascending=False).reset_index(drop=True)
-        lb.insert(0, "Position", lb.index + 1)
-        st.dataframe(lb, hide_index=True, use_container_width=True)
+    render_leaderboard(season_year, lb)
 
 # -------------------------------------------------------------
 #                FITNESS ACTIVITY TAB
 # -------------------------------------------------------------
-with tab_activity:
-    st.markdown("<div class='glow-header'>Fitness Activity</div>", unsafe_allow_html=True)
+@st.fragment
+def render_activity(season_year, mus_df, hours_df, sessions_per_day):
+    with fragment_stage("tab: Fitness Activity"):
+        st.markdown("<div class='glow-header'>Fitness Activity</div>", unsafe_allow_html=True)
+
+        st.markdown("<div class='sub-header'>🔥 Most Trained Muscle Groups</div>", unsafe_allow_html=True)
+        if len(mus_df) == 0:
+            st.info("No muscle data for this season.")
+        else:
+            plot("muscles", season_year, None,
+                 lambda px: px.bar(mus_df.sort_values("Count", ascending=False), x="Muscle", y="Count"))
 
-    st.markdown("<div class='sub-header'>🔥 Most Trained Muscle Groups</div>", unsafe_allow_html=True)
-    if len(mus_df) == 0:
-        st.info("No muscle data for this season.")
-    else:
-        st.plotly_chart(px.bar(mus_df.sort_values("Count", ascending=False), x="Muscle", y="Count"), use_container_width=True)
+        st.markdown("<div class='sub-header'>⏳ Total Hours per Member</div>", unsafe_allow_html=True)
+        if len(hours_df) == 0:
+            st.info("No duration data for this season.")
+        else:
+            plot("hours", season_year, None, lambda px: px.bar(hours_df, x="User", y="Hours"))
 
-    st.markdown("<div class='sub-header'>⏳ Total Hours per Member</div>", unsafe_allow_html=True)
-    if len(hours_df) == 0:
-        st.info("No duration data for this season.")
-    else:
-        st.plotly_chart(px.bar(hours_df, x="User", y="Hours"), use_container_width=True)
+        st.markdown("<div class='sub-header'>📅 Training Frequency (7-Day Avg)</div>", unsafe_allow_html=True)
+        if len(sessions_per_day) == 0:
+            st.info("No daily frequency data for this season.")
+        else:
+            plot("7-day avg", season_year, None,
+                 lambda px: px.line(weekly_buckets(sessions_per_day, MAX_DAILY_POINTS), x="date", y="7day_avg"))
 
-    st.markdown("<div class='sub-header'>📅 Training Frequency (7-Day Avg)</div>", unsafe_allow_html=True)
-    if len(sessions_per_day) == 0:
-        st.info("No daily frequency data for this season.")
-    else:
-        st.plotly_chart(px.line(sessions_per_day, x="date", y="7day_avg"), use_container_width=True)
+with tab_activity:
+    render_activity(season_year, mus_df, hours_df, sessions_per_day)
 
 # -------------------------------------------------------------
 #                DASHBOARD TAB
 # -------------------------------------------------------------
+@st.fragment
+def render_dashboard(df_season):
+    with fragment_stage("tab: Dashboard"):
+        st.markdown("<div class='glow-header'>Dashboard Overview</div>", unsafe_allow_html=True)
+        # rows are timestamp-ordered, so newest first is the season reversed
+        window = page_window(len(df_season), "dash")
+        recent = df_season.iloc[::-1].iloc[window]
+        recent = recent.assign(date=recent[col_timestamp].dt.date)
+        st.dataframe(recent, hide_index=True, use_container_width=True)
+
 with tab_dash:
-    st.markdown("<div class='glow-header'>Dashboard Overview</div>", unsafe_allow_html=True)
-    st.dataframe(df_season.sort_values(col_timestamp, ascending=False).head(25), hide_index=True, use_container_width=True)
+    render_dashboard(df_season)
 
 # -------------------------------------------------------------
 #                RANKING SYSTEM TAB
 # -------------------------------------------------------------
-with tab_ranks:
+with tab_ranks, stage("tab: Ranking System"):
     st.markdown("<div class='glow-header'>Ranking System</div>", unsafe_allow_html=True)
 
+    # sessions ranges come from the same thresholds as the ranks; consistency
+    # (active days / elapsed days) is not tied to them, so it has no column
+    mins = list(RANKS["min_sessions"]) + [RANK_MAX + 1]
+    rank_rows = "".join(
+        f"<tr class=\"{letter.lower()}-rank\"><td>{RANK_CONFIG[letter]['label']}</td><td>{letter}</td>"
+        f"<td>{lo}–{min(hi - 1, RANK_MAX)}</td></tr>\n"
+        for letter, lo, hi in reversed(list(zip(RANKS["letter"], mins, mins[1:])))
+    )
     rank_html = """
     <style>
     .rank-table { width: 100%; border-collapse: collapse; margin-top: 10px; }
@@ -472,13 +680,29 @@ with tab_ranks:
     </style>
 
     <table class="rank-table">
-        <tr><th>Rank</th><th>Letter</th><th>Sessions Range</th><th>Consistency %</th></tr>
-        <tr class="s-rank"><td>S-Rank Athlete</td><td>S</td><td>250–365</td><td>68–100%</td></tr>
-        <tr class="a-rank"><td>A-Rank Athlete</td><td>A</td><td>180–249</td><td>49–68%</td></tr>
-        <tr class="b-rank"><td>B-Rank Athlete</td><td>B</td><td>120–179</td><td>33–49%</td></tr>
-        <tr class="c-rank"><td>C-Rank Athlete</td><td>C</td><td>60–119</td><td>16–33%</td></tr>
-        <tr class="d-rank"><td>D-Rank Athlete</td><td>D</td><td>30–59</td><td>8–16%</td></tr>
-        <tr class="e-rank"><td>E-Rank Athlete</td><td>E</td><td>0–29</td><td>0–8%</td></tr>
+        <tr><th>Rank</th><th>Letter</th><th>Sessions Range</th></tr>
+        """ + rank_rows + """
     </table>
     """
+    import streamlit.components.v1 as components
     components.html(rank_html, height=500, scrolling=False)
+
+# -------------------------------------------------------------
+#                DIAGNOSTICS PANEL
+# -------------------------------------------------------------
+timings = stop_profile()
+if PROFILE:
+    log_timings("rerun", timings, season=season_year)
+if SHOW_DIAGNOSTICS:
+    with st.expander("🧪 Diagnostics: stage timings for this rerun", expanded=False):
+        timing_df = pd.DataFrame(timings)
+        timing_df["stage"] = ["· " * d + n for d, n in zip(timing_df["depth"], timing_df["stage"])]
+        st.dataframe(timing_df.drop(columns="depth"), hide_index=True, use_container_width=True)
+        if dataset.get("refresh_timings"):
+            st.caption(f"Refresh that built data version {dataset['hash'][:12]} "
+                       f"at {dataset['built_at']:%H:%M:%S}:")
+            refresh_df = pd.DataFrame(dataset["refresh_timings"])
+            refresh_df["stage"] = ["· " * d + n for d, n in zip(refresh_df["depth"], refresh_df["stage"])]
+            st.dataframe(refresh_df.drop(columns="depth"), hide_index=True, use_container_width=True)
+        if not PROFILE:
+            st.caption("Set BEKFE_PROFILE=1 to also trace memory and log these as JSON lines.")
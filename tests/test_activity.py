@@ -0,0 +1,54 @@
+import pandas as pd
+
+import bekfe_core as core
+
+HEADER = "Timestamp,Name,Gender,Muscles Trained,Duration\n"
+
+
+def build(tmp_path, text):
+    path = tmp_path / "responses.csv"
+    path.write_text(text)
+    return core.load_file(str(path))
+
+
+def assert_no_seasons(dataset):
+    members = dataset["cube"]["members"]
+    assert len(members) == 0
+    assert list(members.index.names) == ["year", "member"]
+    assert {"streak", "best_streak", "rate_7d", "rate_30d", "consistency"} <= set(members.columns)
+    assert dataset["seasons"] == {}
+
+
+def test_header_only_sheet(tmp_path):
+    assert_no_seasons(build(tmp_path, HEADER))
+
+
+def test_no_parseable_dates(tmp_path):
+    assert_no_seasons(build(tmp_path, HEADER + "garbage,Alain,Male,Chest,1h\nnope,Louis,Male,Back,30\n"))
+
+
+def test_incremental_matches_full(tmp_path):
+    from benchmarks.synthetic import generate_csv
+
+    raw = generate_csv(3000, 12, seed=3)
+    prefix = b"\n".join(raw.split(b"\n")[:2501]) + b"\n"
+    old = core.build_dataset("old", prefix)
+    new = core.build_dataset("new", raw, previous=old)
+    full = core.activity_matrix(new["df"])
+
+    assert new["cube"]["activity"]["rows"] == full["rows"]
+    for year, season in full["seasons"].items():
+        got = new["cube"]["activity"]["seasons"][year]
+        order = pd.Index(got["members"]).get_indexer(season["members"])
+        assert (got["bits"][order] == season["bits"]).all()
+
+
+def test_edited_prefix_is_rebuilt():
+    from benchmarks.synthetic import generate_csv
+
+    old = core.build_dataset("old", generate_csv(500, 8, seed=4))
+    edited = old["df"].copy()
+    names = edited[edited.columns[1]]
+    edited.iloc[0, 1] = next(n for n in names.cat.categories if n != names.iloc[0])
+    assert core.extend_activity(old["cube"]["activity"], old["df"], edited) is None
+    assert core.extend_activity(old["cube"]["activity"], old["df"], old["df"]) is not None
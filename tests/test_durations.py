@@ -0,0 +1,63 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bekfe_core as core
+
+
+def reference(values: pd.Series) -> tuple[pd.Series, int]:
+    # the per-row parser, plus which non-empty values matched none of its rules
+    def parsed(t):
+        if not isinstance(t, str):
+            return False
+        t = t.lower()
+        return bool(re.search(r"\d+\s*(hour|hr|h|min|m)", t)) or len(re.findall(r"\d+", t)) in (1, 2)
+
+    unparsed = sum(1 for t in values if pd.notna(t) and not parsed(t))
+    return values.apply(core.parse_duration), unparsed
+
+
+def check(values: pd.Series, unparsed: int | None = None):
+    minutes, count = core.parse_durations(values)
+    expected, expected_count = reference(values)
+    assert minutes.tolist() == expected.tolist()
+    assert count == expected_count
+    if unparsed is not None:
+        assert count == unparsed
+
+
+@pytest.mark.parametrize("text, minutes", [
+    ("1h 30m", 90), ("1h30", 60), ("2 hours", 120), ("1hr 15min", 75),
+    ("90 min", 90), ("45m", 45), ("50 mins", 50),
+    ("1 30", 90), ("1:15", 75), ("45", 45), ("  60 ", 60), ("1H", 60),
+])
+def test_shapes(text, minutes):
+    assert core.parse_durations(pd.Series([text]))[0].tolist() == [minutes]
+    check(pd.Series([text]), unparsed=0)
+
+
+def test_unparseable_are_counted():
+    values = pd.Series(["", "long", "??", "1 2 3", "1h", None, np.nan])
+    check(values, unparsed=4)
+    assert core.parse_durations(values)[0].tolist() == [0, 0, 0, 0, 60, 0, 0]
+
+
+def test_non_strings():
+    # numbers mixed into a text column, and a column read as numbers
+    check(pd.Series(["45", 30, 1.5, None, "1h"], dtype=object), unparsed=2)
+    minutes, count = core.parse_durations(pd.Series([30.0, 45.0, np.nan]))
+    assert minutes.tolist() == [0, 0, 0]
+    assert count == 2
+
+
+def test_fuzz():
+    rng = np.random.default_rng(0)
+    tokens = ["1", "2", "15", "30", "45", "90", "h", "hr", "hour", "hours", "m", "min", "mins",
+              "H", "Min", " ", "  ", ":", ",", "and", "x", "?", "long", ""]
+    values = pd.Series(
+        ["".join(rng.choice(tokens, rng.integers(0, 6))) for _ in range(5000)]
+        + [None, 12, 3.5], dtype=object,
+    )
+    check(values)
@@ -0,0 +1,15 @@
+import bekfe_core as core
+from benchmarks.synthetic import generate_csv
+
+
+def test_season_and_member_slices_match_masks():
+    data = core.build_dataset("v", generate_csv(3000, 10, seed=5))
+    muscles = data["muscles"]
+    for year in muscles["year"].dropna().unique():
+        masked = muscles[muscles["year"] == year]
+        season = core.season_rows(muscles, data["muscle_bounds"], int(year))
+        assert season.equals(masked)
+        for user, rows in data["muscle_rows"][int(year)].items():
+            # same rows in the same order, so count_muscles ties break the same way
+            expected = core.count_muscles(masked[masked["user"] == user])
+            assert core.count_muscles(season.iloc[rows]).equals(expected)
@@ -0,0 +1,35 @@
+import time
+
+import bekfe_core as core
+from benchmarks.synthetic import generate_csv
+
+
+def dataset(seed):
+    return core.build_dataset(f"version-{seed}", generate_csv(300, 6, seed=seed))
+
+
+def test_latest_follows_a_version_already_on_disk(tmp_path):
+    a, b = dataset(1), dataset(2)
+    core.write_results(tmp_path, a)
+    core.write_results(tmp_path, b)
+    assert core.read_results(tmp_path)[2025]["summary"] == b["seasons"][2025]["summary"]
+
+    # the sheet is reverted: A is live again, and written files are reused
+    core.write_results(tmp_path, a)
+    assert core.read_results(tmp_path)[2025]["summary"] == a["seasons"][2025]["summary"]
+
+
+def test_live_version_is_never_pruned(tmp_path):
+    kept = core.RESULT_VERSIONS_KEPT
+    versions = [dataset(seed) for seed in range(kept + 1)]
+    for data in versions[:kept]:
+        core.write_results(tmp_path, data)
+        time.sleep(0.01)  # distinct mtimes
+    # the oldest version becomes live again, then one more arrives:
+    # the next oldest is pruned, not the one just served
+    core.write_results(tmp_path, versions[0])
+    time.sleep(0.01)
+    core.write_results(tmp_path, versions[kept])
+
+    assert core.read_results(tmp_path, versions[0]["hash"]) is not None
+    assert core.read_results(tmp_path, versions[1]["hash"]) is None
@@ -0,0 +1,73 @@
+import hashlib
+import json
+
+import pandas as pd
+import pytest
+
+import bekfe_core as core
+from benchmarks.synthetic import generate_csv
+
+
+@pytest.fixture
+def store(tmp_path):
+    raw = generate_csv(200, 5, seed=7)
+    core.build_dataset("v1", raw, store=tmp_path)
+    assert core.snapshot_hash(tmp_path) == "v1"
+    return tmp_path
+
+
+def test_offline_start_from_snapshot(store):
+    assert len(core.prepare_data("v1", None, store=store)) == 200
+
+
+@pytest.mark.parametrize("damage", ["missing", "corrupt", "row count"])
+def test_broken_snapshot_is_not_offered(store, damage):
+    rows_path, meta_path = core.snapshot_paths(store)
+    if damage == "missing":
+        rows_path.unlink()
+    elif damage == "corrupt":
+        rows_path.write_bytes(b"not parquet")
+    else:
+        meta = json.loads(meta_path.read_text())
+        meta["rows"] += 1
+        meta_path.write_text(json.dumps(meta))
+
+    assert core.snapshot_hash(store) is None
+    with pytest.raises(FileNotFoundError):
+        core.prepare_data("v1", None, store=store)
+
+
+def incremental_and_full(store, raw, cut, monkeypatch):
+    # a first refresh sees the sheet up to row `cut`, the next one all of it
+    first = b"\n".join(raw.split(b"\n")[:cut + 1]) + b"\n"
+    core.prepare_data(hashlib.sha256(first).hexdigest(), first, store=store)
+
+    appended = []
+    parse_new_rows = core.parse_new_rows
+    monkeypatch.setattr(core, "parse_new_rows", lambda *a: appended.append(a) or parse_new_rows(*a))
+    data_hash = hashlib.sha256(raw).hexdigest()
+    incremental = core.prepare_data(data_hash, raw, store=store)
+    assert len(appended) == 1  # the snapshot was extended, not rebuilt
+    return incremental, core.prepare_data(data_hash, raw)
+
+
+def assert_same_rows(a, b):
+    pd.testing.assert_frame_equal(
+        a.reset_index(drop=True).astype(object), b.reset_index(drop=True).astype(object))
+    assert a.attrs["parse_stats"] == b.attrs["parse_stats"]
+
+
+def test_incremental_matches_full_parse(tmp_path, monkeypatch):
+    raw = generate_csv(1000, 8, seed=8)
+    assert_same_rows(*incremental_and_full(tmp_path, raw, 900, monkeypatch))
+
+
+def test_appended_rows_keep_the_sheets_date_format(tmp_path, monkeypatch):
+    # a day-first sheet whose first date is ambiguous, so only the retry
+    # finds the format; the appended row alone would be read month-first
+    rows = [f"{day}/1/2025 10:00:00,Alain,Male,Chest,1h" for day in [2, *range(14, 25)]]
+    raw = ("Timestamp,Name,Gender,Muscles Trained,Duration\n"
+           + "\n".join(rows + ["3/4/2025 10:00:00,Louis,Male,Back,45"]) + "\n").encode()
+    incremental, full = incremental_and_full(tmp_path, raw, len(rows), monkeypatch)
+    assert full.iloc[-1]["Timestamp"] == pd.Timestamp(2025, 4, 3, 10)
+    assert_same_rows(incremental, full)
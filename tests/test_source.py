@@ -0,0 +1,13 @@
+import http.client
+
+import bekfe_core as core
+
+
+def test_dropped_connection_is_reported_not_raised(monkeypatch):
+    def fail(*args):
+        raise http.client.IncompleteRead(b"Timestamp,Na", 100)
+
+    monkeypatch.setattr(core, "fetch_http", fail)
+    state = core.new_source_state()
+    assert core.fetch_source("https://example.invalid/sheet.csv", state) == (None, None)
+    assert state["error"].startswith("IncompleteRead")
@@ -0,0 +1,11 @@
+import pytest
+
+import bekfe_core as core
+from benchmarks.synthetic import generate, member_pool
+
+
+@pytest.mark.parametrize("members", [1, 5, 10, 15, 40])
+def test_requested_member_count(members):
+    names = set(generate(5000, members, seed=0)["Name"].map(core.clean_name))
+    assert names == {core.clean_name(n) for n in member_pool(members)}
+    assert len(names) == members